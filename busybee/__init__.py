@@ -1,3 +1,5 @@
 from ._busybee import _map as map
 from ._busybee import _filter as filter
 from ._busybee import _mk_dict as mk_dict
+from ._async import _map_async as map_async
+from ._lines import _map_lines as map_lines
@@ -0,0 +1,43 @@
+"""The command line interface of the busybee module. It is available as `busybee` after
+installation or as `python -m busybee`.
+
+Run `busybee worker --connect host:port` to start workers for the `cluster` backend.
+"""
+
+import argparse
+
+from ._busybee import _parse_core_spec
+from ._cluster import _run_workers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="busybee")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    worker = commands.add_parser(
+        "worker", help="process chunks of a driver using the `cluster` backend")
+    worker.add_argument(
+        "--connect", required=True, metavar="HOST:PORT",
+        help="the address of the driver")
+    worker.add_argument(
+        "--processes", default="n",
+        help="the number of worker processes, e.g. `8`, `n`, `n-1` (default: n)")
+    worker.add_argument(
+        "--authkey", default=None,
+        help="the shared secret of the driver (default: $BUSYBEE_AUTHKEY)")
+    worker.add_argument(
+        "--retry", type=float, default=60.0, metavar="SECONDS",
+        help="exit when no driver could be reached for this long (default: 60)")
+
+    args = parser.parse_args(argv)
+    if args.command == "worker":
+        _run_workers(
+            args.connect,
+            args.authkey,
+            _parse_core_spec(args.processes),
+            retry_seconds=args.retry,
+        )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
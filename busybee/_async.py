@@ -0,0 +1,107 @@
+"""This file provides `map_async` which runs `map` in a background thread and
+returns a handle to observe and cancel the run. The `_map_async` method is
+exported on module level through __init__.py."""
+
+import threading
+from concurrent.futures import CancelledError, TimeoutError
+
+from ._busybee import _map
+
+
+class _MapHandle():
+    """The handle of a `map_async` run. The counters `num_processed`, `num_total`,
+    `num_processes`, and `total_cpu_time` are updated by the run as it progresses.
+    """
+
+    def __init__(self):
+        self.num_processed = 0
+        self.num_total = 0
+        self.num_processes = 0
+        self.total_cpu_time = 0.0
+
+        self._cancel_requested = threading.Event()
+        self._done = threading.Event()
+        self._result = None
+        self._exception = None
+        self._thread = None
+
+    def _run(self, func, data, kwargs):
+        try:
+            self._result = _map(func, data, _handle=self, **kwargs)
+        except BaseException as e:
+            self._exception = e
+        finally:
+            self._done.set()
+
+    def result(self, timeout=None):
+        """Waits up to `timeout` seconds for the run to finish and returns its result.
+
+        Raises:
+            TimeoutError: If the run did not finish in time
+            CancelledError: If the run was cancelled
+            Any exception raised by the run, e.g. from `func`
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError()
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def done(self):
+        """Returns `True` if the run finished, failed, or was cancelled."""
+        return self._done.is_set()
+
+    def cancel(self):
+        """Cancels the run, terminates outstanding work, and waits until the workers are
+        cleaned up. Returns `True` if the run was cancelled and `False` if it had already
+        finished.
+        """
+        if self.done():
+            return False
+
+        self._cancel_requested.set()
+        self._done.wait()
+        return self.cancelled()
+
+    def cancelled(self):
+        """Returns `True` if the run was cancelled."""
+        return isinstance(self._exception, CancelledError)
+
+    def cancel_requested(self):
+        return self._cancel_requested.is_set()
+
+    def progress(self):
+        """Returns a dict with the current `num_processed`, `num_total`, `num_processes`, and
+        `total_cpu_time` of the run. These are the same counters that the progress messages
+        are based on.
+        """
+        return {
+            "num_processed": self.num_processed,
+            "num_total": self.num_total,
+            "num_processes": self.num_processes,
+            "total_cpu_time": self.total_cpu_time,
+        }
+
+
+def _map_async(func, data, **kwargs):
+    """Like `map(func, data, ...)` but returns immediately with a handle while the processing
+    happens in a background thread. This allows to do other work or to overlap several runs.
+
+    Args:
+        func: See the map(...) function.
+
+        data (list): See the map(...) function.
+
+        For the other arguments see the map(...) function.
+
+    Returns:
+        A handle providing `.result(timeout)`, `.done()`, `.cancel()`, and `.progress()`.
+    """
+    handle = _MapHandle()
+    handle._thread = threading.Thread(
+        target=handle._run,
+        args=(func, data, kwargs),
+        name="busybee-map-async",
+    )
+    handle._thread.start()
+    return handle
@@ -0,0 +1,173 @@
+"""This file provides `processes="auto"` which chooses the number of processes based on
+the measured scaling of `func`. The first items of a run are processed at increasing
+numbers of in-flight items and the rest of the run uses the knee of the scaling curve.
+The choice can be stored per function name for subsequent calls."""
+
+import functools
+import json
+import math
+import os
+import tempfile
+import time
+
+
+class _ScalingProbe():
+    """Measures the throughput at 1, 2, 4, ... up to `max_limit` in-flight items and then fixes
+    the limit at the knee of the scaling curve, i.e. the smallest level whose throughput is
+    within `tolerance` of the best one. Probing stops early once doubling the level does not
+    improve the throughput by more than `tolerance`, and after at most `max_items` items.
+
+    A level is measured in wall-clock time over at least `rounds` items per in-flight item and,
+    based on the processing times of the previous level, `min_seconds` of processing per
+    in-flight item. The items completing right after a level change were dispatched at the
+    previous level and are not measured. When the limit is fixed, `on_choice` is called with
+    the probe.
+
+    Provides the interface of `_ConcurrencyLimit` for dispatching the items.
+    """
+
+    def __init__(self, max_limit, max_items, tolerance=0.1, rounds=4, min_seconds=0.05,
+                 on_choice=None, current_time=lambda: time.time()):
+        self.levels = [2**i for i in range(int(math.log2(max_limit)) + 1)]
+        if self.levels[-1] != max_limit:
+            self.levels.append(max_limit)
+
+        self.max_items = max_items
+        self.tolerance = tolerance
+        self.rounds = rounds
+        self.min_seconds = min_seconds
+        self.on_choice = on_choice
+        self.current_time = current_time
+
+        self.throughputs = {}
+        self.choice = None
+        self.completed = 0
+
+        # the first item is not measured as it includes the one-off costs such as imports
+        self._start_level(0, num_warmup=1, num_target=rounds)
+        if len(self.levels) == 1:
+            self.choice = max_limit
+
+    def _start_level(self, level_idx, num_warmup, num_target):
+        self.level_idx = level_idx
+        self.num_warmup = num_warmup
+        self.num_target = num_target
+        self.num_measured = 0
+        self.total_latency = 0.0
+        self.time_level_start = self.current_time()
+
+    def current(self):
+        """Returns the current number of items that may be in flight."""
+        return self.choice if self.choice is not None else self.levels[self.level_idx]
+
+    def update(self, latency):
+        """Updates the measurement with the `latency` of a completed item in seconds."""
+        if self.choice is not None:
+            return
+
+        self.completed += 1
+        if self.num_warmup > 0:
+            self.num_warmup -= 1
+            self.time_level_start = self.current_time()
+        else:
+            self.num_measured += 1
+            self.total_latency += latency
+
+        if self.num_measured >= self.num_target:
+            self._finish_level()
+        elif self.completed >= self.max_items:
+            self._choose()
+
+    def _finish_level(self):
+        level = self.levels[self.level_idx]
+        time_delta = max(self.current_time() - self.time_level_start, 1e-9)
+        throughput = self.num_measured / time_delta
+        best = max(self.throughputs.values(), default=0.0)
+        self.throughputs[level] = throughput
+
+        if best > 0.0 and throughput <= best * (1.0 + self.tolerance):
+            self._choose()
+            return
+        if self.level_idx + 1 == len(self.levels) or self.completed >= self.max_items:
+            self._choose()
+            return
+
+        next_level = self.levels[self.level_idx + 1]
+        mean_latency = self.total_latency / self.num_measured
+        min_items = math.ceil(self.min_seconds * next_level / mean_latency) if mean_latency > 0 else 0
+        self._start_level(
+            self.level_idx + 1,
+            num_warmup=level,
+            num_target=max(self.rounds * next_level, min_items),
+        )
+
+    def _choose(self):
+        if self.throughputs:
+            best = max(self.throughputs.values())
+            self.choice = min(l for l, t in self.throughputs.items() if t * (1.0 + self.tolerance) >= best)
+        else:
+            self.choice = self.levels[self.level_idx]
+
+        if self.on_choice:
+            self.on_choice(self)
+
+
+def _func_name(func):
+    """Returns the qualified name of `func`. A `functools.partial` is named after its function.
+    A callable object with a `__wrapped__` function, such as the one of `map_lines`, is named
+    after both its class and the wrapped function as it changes the work per item.
+    """
+    while isinstance(func, functools.partial):
+        func = func.func
+
+    name = getattr(func, "__qualname__", None)
+    if name is not None:
+        return "%s.%s" % (getattr(func, "__module__", None) or type(func).__module__, name)
+
+    name = "%s.%s" % (type(func).__module__, type(func).__qualname__)
+    if hasattr(func, "__wrapped__"):
+        name += "(%s)" % _func_name(func.__wrapped__)
+    return name
+
+
+def _choice_key(func, num_cpus):
+    """Returns the key of the stored choice for `func` on a machine with `num_cpus` CPUs."""
+    return "%s@%d" % (_func_name(func), num_cpus)
+
+
+def _load_choice(path, key):
+    """Returns the number of processes stored for `key` in the JSON file at `path` or `None` if
+    there is none.
+    """
+    path = os.path.expanduser(path)
+    try:
+        with open(path) as f:
+            choice = json.load(f).get(key)
+    except (OSError, ValueError, AttributeError):
+        return None
+    return choice if isinstance(choice, int) and choice >= 1 else None
+
+
+def _store_choice(path, key, choice):
+    """Stores the number of processes `choice` for `key` in the JSON file at `path`. The file is
+    replaced atomically. Failures are ignored as the choice can be probed again.
+    """
+    path = os.path.expanduser(path)
+    try:
+        with open(path) as f:
+            choices = json.load(f)
+        if not isinstance(choices, dict):
+            choices = {}
+    except (OSError, ValueError):
+        choices = {}
+    choices[key] = choice
+
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".busybee-", suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(choices, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
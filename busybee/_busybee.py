@@ -1,13 +1,31 @@
 """The internal implementation of the busybee module. The `_map` method is
 exported on module level through __init__.py."""
 
+import itertools
 import math
 import multiprocessing as mp
+from concurrent.futures import CancelledError
+import queue
+import shutil
+import tempfile
 import time
 import os
+import pickle
 import sys
-
-from ._string_helpers import _start_string, _progress_string, _finish_string
+import threading
+
+from ._autoscale import _ScalingProbe, _choice_key, _load_choice, _store_choice
+from ._cluster import _ClusterDriver
+from ._concurrency import _ConcurrencyLimit, _TokenBucket
+from ._nesting import _in_pool_worker, _borrow_slots, _release_slots, _start_thread_pool, \
+    _meta_func_threaded
+from ._cpus import _available_cpus, _available_cpu_count, _cap_thread_env, _restore_thread_env, \
+    _limit_threads, _pin_to_cpu
+from ._profiling import _start_worker_profiler, _merge_profiles, _profile_string
+from ._spill import _SpillingList
+from ._serialization import _Serializer, _payload_size
+from ._string_helpers import _auto_string, _start_string, _cluster_start_string, _nested_start_string, _progress_string, \
+    _finish_string, _transfer_string
 
 __VALUE_ERROR_INVALID_CORE_SPEC = ValueError(
     "Invalid core_spec! Try: `1`, `8`, `n/2`, `n-1`")
@@ -15,14 +33,41 @@ __VALUE_ERROR_INVALID_CORE_SPEC = ValueError(
 __VALUE_ERROR_INVALID_REL_CORE_SPEC = ValueError(
     "Invalid relative core_spec! Try: `n`, `n/2`, `n-1`")
 
+_BACKENDS = ("pool", "cluster")
+
+__VALUE_ERROR_INVALID_BACKEND = ValueError(
+    "Invalid backend! Try: `pool`, `cluster`")
+
+_CONCURRENCY_MODES = (None, "adaptive")
+
+__VALUE_ERROR_INVALID_CONCURRENCY = ValueError(
+    "Invalid concurrency! Try: `None`, `adaptive`")
+
+_NESTED_MODES = ("threads", "serial")
+
+__VALUE_ERROR_INVALID_NESTED = ValueError(
+    "Invalid nested! Try: `threads`, `serial`")
+
+__VALUE_ERROR_INVALID_PRELOAD = ValueError(
+    "Preloading modules requires the `forkserver` start method")
 
-def _parse_core_spec(core_spec, core_count=lambda: mp.cpu_count()):
+# Seconds to wait for each pool worker to report that it is ready
+_STARTUP_TIMEOUT = 60
+
+# Seconds between checks whether a run has been cancelled while waiting for results
+_POLL_INTERVAL = 0.1
+
+# Serializes the changes of the thread environment variables of overlapping runs, e.g. of `map_async`
+_THREAD_ENV_LOCK = threading.Lock()
+
+
+def _parse_core_spec(core_spec, core_count=lambda: _available_cpu_count()):
     """Parses a `core_spec` that expresses the number of intended processes for execution
     of one of the high-level API calls. The core specification can be of two types.
 
     Type I is explicit by providing the number of processes to use.
 
-    Type II is implicit by providing a value relative to the number of logical CPUs `n`.
+    Type II is implicit by providing a value relative to the number of available logical CPUs `n`.
     For Type II both simple division and substraction are allowed in the forms `n/c`
     and `n-c` where `c` is an integer. The result will increased if it is below 1.
 
@@ -31,8 +76,9 @@ def _parse_core_spec(core_spec, core_count=lambda: mp.cpu_count()):
     Args:
         core_spec (String): The core specification to parse
         core_count (lambda: () -> int): A function to return the actual number of
-                                        logical CPUs. Defaults to the number returned
-                                        by the multiprocessing package
+                                        logical CPUs. Defaults to the number of CPUs
+                                        available to this process, i.e. honoring the CPU
+                                        affinity and cgroup quotas
 
     Raises:
         ValueError: When given an invalid core spec
@@ -117,19 +163,285 @@ class _ProgressUpdateLimit():
 
 
 def _meta_func(args):
-    """Takes args in the form `(func, data)` and calls `func(data)`.
+    """Takes args in the form `(func, data)` and calls `func(data)`. The call is profiled
+    if the current worker has a profiler. If the worker shares the `slots` of the worker
+    budget, it holds one of them during the call and counts the item as started.
 
     Returns a tuple consisting of the `func` return value and the processing time in seconds.
     """
-    time_start = time.time()
+    slots = _worker.get("slots")
+    if slots is not None:
+        slots.acquire()
+        with _worker["num_unstarted"].get_lock():
+            _worker["num_unstarted"].value -= 1
+
+    try:
+        time_start = time.time()
 
-    func, data = args
-    result = func(data)
+        func, data = args
+        profiler = _worker.get("profiler")
+        result = profiler.call(func, data) if profiler else func(data)
+
+        time_delta = time.time() - time_start
+    finally:
+        if slots is not None:
+            slots.release()
 
-    time_delta = time.time() - time_start
     return result, time_delta
 
 
+# The state of the current worker process. It is set up by `_init_worker`.
+_worker = {}
+
+
+def _init_worker(config):
+    """Initializes a pool worker with the given `config` dict. If it contains a `serializer`,
+    the serialized `func` is loaded once per worker and not transferred with every item.
+    With `threads` the thread pools of numerical libraries are capped, with `cpus` the
+    worker is pinned to one of them, and with `profile_dir` the calls of `func` are
+    profiled. The `slots` of the worker budget and the number of unstarted items,
+    `num_unstarted`, are kept for nested calls. Finally, the
+    worker puts the current time into the `ready_queue`.
+    """
+    _worker["slots"] = config.get("slots")
+    _worker["num_unstarted"] = config.get("num_unstarted")
+    if config.get("threads"):
+        _limit_threads(config["threads"])
+    if config.get("cpus"):
+        _pin_to_cpu(config["cpus"], config["cpu_counter"])
+    if config.get("profile_dir"):
+        _worker["profiler"] = _start_worker_profiler(config["profile_dir"], config["profile_sample_rate"])
+
+    serializer = config.get("serializer")
+    if serializer:
+        _worker["serializer"] = serializer
+        _worker["func"] = serializer.loads(config["func_payload"])
+
+    config["ready_queue"].put(time.time())
+
+
+def _start_pool(num_processes, worker_config, start_method=None, preload=None, pin_workers=False, num_items=0):
+    """Starts a pool with `num_processes` workers that are initialized with the `worker_config`
+    and waits for all of them to be ready. If `preload` modules are given, the `forkserver`
+    start method is used and the modules are imported once by the fork server. Note that
+    the fork server is started only once per process and keeps its initial preloads and
+    environment. If `pin_workers` is set, every worker is pinned to a distinct available CPU.
+    The workers share a budget of `num_processes` slots with nested calls of `map`, which only
+    borrow slots once all of the `num_items` items of the pool have been started.
+
+    Raises:
+        ValueError: When given an unknown start method or `preload` with another start method
+
+    Returns:
+        A tuple of the pool and the startup time in seconds. The latter is `None` if not all
+        workers reported to be ready in time.
+    """
+    if preload and start_method is None:
+        start_method = "forkserver"
+    if preload and start_method != "forkserver":
+        raise __VALUE_ERROR_INVALID_PRELOAD
+
+    ctx = mp.get_context(start_method)
+    if preload:
+        ctx.set_forkserver_preload(list(preload))
+
+    worker_config = dict(
+        worker_config,
+        ready_queue=ctx.Queue(),
+        slots=ctx.BoundedSemaphore(num_processes),
+        num_unstarted=ctx.Value("q", num_items),
+    )
+    if pin_workers:
+        worker_config.update(cpus=_available_cpus(), cpu_counter=ctx.Value("i", 0))
+
+    # the thread limits also apply to the environment that spawned workers and the fork server inherit
+    with _THREAD_ENV_LOCK:
+        previous_env = _cap_thread_env(worker_config["threads"]) if worker_config.get("threads") else {}
+        try:
+            time_start = time.time()
+            pool = ctx.Pool(
+                processes=num_processes,
+                initializer=_init_worker,
+                initargs=(worker_config,),
+            )
+        finally:
+            _restore_thread_env(previous_env)
+
+    ready_times = []
+    try:
+        for _ in range(num_processes):
+            ready_times.append(worker_config["ready_queue"].get(timeout=_STARTUP_TIMEOUT))
+    except queue.Empty:
+        return pool, None
+
+    return pool, max(ready_times) - time_start
+
+
+def _meta_func_serialized(payload):
+    """Like `_meta_func` but takes the serialized data item as `payload` and applies the
+    `func` of the current worker.
+
+    Returns a tuple consisting of the serialized `func` return value and the processing time
+    in seconds.
+    """
+    serializer = _worker["serializer"]
+    result, time_delta = _meta_func((_worker["func"], serializer.loads(payload)))
+    return serializer.dumps(result), time_delta
+
+
+def _meta_func_pickled(args):
+    """Like `_meta_func` but returns the pickled `func` return value. This allows the parent to
+    spill results to disk without pickling them again.
+
+    Returns a tuple consisting of the pickled `func` return value and the processing time in seconds.
+    """
+    result, time_delta = _meta_func(args)
+    return pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), time_delta
+
+
+def _meta_func_chunk(args):
+    """Takes args in the form `(worker_func, chunk)` and applies `worker_func` to every item of
+    the `chunk`.
+
+    Returns a tuple consisting of the list of `worker_func` return values and the total processing
+    time in seconds.
+    """
+    worker_func, chunk = args
+    results = [worker_func(meta_arg) for meta_arg in chunk]
+    return results, sum(time_delta for _, time_delta in results)
+
+
+def _chunks(meta_args, chunksize):
+    """Yields lists of up to `chunksize` consecutive items of the iterable `meta_args`."""
+    iterator = iter(meta_args)
+    while True:
+        chunk = list(itertools.islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _imap(pool, worker_func, meta_args, chunksize, should_stop=lambda: False):
+    """Yields `(idx, out, time_delta)` tuples in order as `pool.imap` but polls `should_stop`
+    while waiting for results. The chunks are built here since `pool.imap` only supports
+    waiting with a timeout for a `chunksize` of 1.
+
+    Raises:
+        CancelledError: If `should_stop` returns `True`
+    """
+    chunks = ((worker_func, chunk) for chunk in _chunks(meta_args, chunksize))
+    outputs = pool.imap(_meta_func_chunk, chunks, chunksize=1)
+    idx = 0
+    while True:
+        try:
+            results, _ = outputs.next(timeout=_POLL_INTERVAL)
+        except mp.TimeoutError:
+            if should_stop():
+                raise CancelledError()
+            continue
+        except StopIteration:
+            return
+
+        for out, time_delta in results:
+            yield idx, out, time_delta
+            idx += 1
+        if should_stop():
+            raise CancelledError()
+
+
+def _imap_windowed(pool, worker_func, meta_args, concurrency_limit, token_bucket=None,
+                   should_stop=lambda: False):
+    """Yields `(idx, out, time_delta)` tuples as the results arrive. Dispatches the items one by
+    one such that no more than `concurrency_limit.current()` items are in flight and, if given,
+    not faster than the `token_bucket` allows. The `concurrency_limit` is updated with the
+    processing time of every item.
+
+    Raises:
+        CancelledError: If `should_stop` returns `True`
+    """
+    results = queue.Queue()
+    pending = enumerate(meta_args)
+    num_in_flight, exhausted = 0, False
+
+    while not exhausted or num_in_flight > 0:
+        # dispatch as many items as currently allowed
+        delay = 0.0
+        while not exhausted and num_in_flight < concurrency_limit.current():
+            delay = token_bucket.delay() if token_bucket else 0.0
+            if delay > 0.0:
+                break
+
+            try:
+                idx, meta_arg = next(pending)
+            except StopIteration:
+                exhausted = True
+                break
+
+            pool.apply_async(
+                worker_func,
+                (meta_arg,),
+                callback=lambda r, idx=idx: results.put((idx, r, None)),
+                error_callback=lambda e, idx=idx: results.put((idx, None, e)),
+            )
+            num_in_flight += 1
+
+        try:
+            idx, r, error = results.get(timeout=min(_POLL_INTERVAL, delay) if delay else _POLL_INTERVAL)
+        except queue.Empty:
+            if should_stop():
+                raise CancelledError()
+            continue
+
+        num_in_flight -= 1
+        if error is not None:
+            raise error
+
+        out, time_delta = r
+        concurrency_limit.update(time_delta)
+        yield idx, out, time_delta
+
+        if should_stop():
+            raise CancelledError()
+
+
+def _imap_probed(pool, worker_func, meta_args, probe, chunksize, token_bucket=None, should_stop=lambda: False):
+    """Yields `(idx, out, time_delta)` tuples as the results arrive. The items are dispatched one by
+    one as allowed by the `probe` until it made its choice. The remaining items are dispatched in
+    chunks of `chunksize` such that no more than the chosen number of chunks are in flight. With a
+    `token_bucket` the items are dispatched one by one throughout.
+
+    Raises:
+        CancelledError: If `should_stop` returns `True`
+    """
+    pending = iter(meta_args)
+
+    def probed_args():
+        while probe.choice is None:
+            try:
+                yield next(pending)
+            except StopIteration:
+                return
+
+    num_probed = 0
+    for idx, out, time_delta in _imap_windowed(
+            pool, worker_func, probed_args(), probe, token_bucket=token_bucket, should_stop=should_stop):
+        num_probed += 1
+        yield idx, out, time_delta
+
+    fixed_limit = _ConcurrencyLimit(max_limit=probe.current(), min_limit=probe.current())
+    if token_bucket:
+        for idx, out, time_delta in _imap_windowed(
+                pool, worker_func, pending, fixed_limit, token_bucket=token_bucket, should_stop=should_stop):
+            yield num_probed + idx, out, time_delta
+        return
+
+    chunks = ((worker_func, chunk) for chunk in _chunks(pending, chunksize))
+    for chunk_idx, results, _ in _imap_windowed(
+            pool, _meta_func_chunk, chunks, fixed_limit, should_stop=should_stop):
+        for offset, (out, time_delta) in enumerate(results):
+            yield num_probed + chunk_idx * chunksize + offset, out, time_delta
+
+
 def _map(
     func,
     data,
@@ -139,6 +451,27 @@ def _map(
     stdout=sys.stdout,
     update_every_n_seconds=5,
     update_every_n_percent=50,
+    serializer=None,
+    compress=False,
+    start_method=None,
+    preload=None,
+    pin_workers=False,
+    limit_threads=True,
+    profile=False,
+    profile_sample_rate=1.0,
+    concurrency=None,
+    max_rate=None,
+    spill_to=None,
+    spill_memory_budget=2**30,
+    backend="pool",
+    cluster_address="0.0.0.0:7392",
+    cluster_authkey=None,
+    cluster_heartbeat_timeout=10,
+    cluster_idle_timeout=600,
+    nested="threads",
+    auto_cache=None,
+    _handle=None,
+    _item_sizes=None,
 ):
     """Applies the given `func` to every item in `data` using up to the number of processes
     specified by `processes`. Interactive updates are provided via `stdout` following the limits
@@ -146,7 +479,7 @@ def _map(
 
     Args:
         func: The function that will be applied to the `data` items. It needs to be pickleable and
-            therefore it must not be a lambda expression.
+            therefore it must not be a lambda expression unless the `cloudpickle` serializer is used.
 
         data (list): The data that is processed by `func`. This must provide random access and `len()` support.
                      Ideally this is a simple list.
@@ -155,7 +488,11 @@ def _map(
 
         processes (int or string): A number of processes to use (e.g. 1, 8) or a simple formula expressing
                                 the number of processes relative to the number of logical cores (e.g. `n`,
-                                `n/2`, `n-1). Only simple substraction and division are supported.
+                                `n/2`, `n-1). Only simple substraction and division are supported. The
+                                number of logical cores honors the CPU affinity and cgroup CPU quotas.
+                                With `auto`, the first items are processed with 1, 2, 4, ... up to `n` items in
+                                flight and the rest of the run uses the smallest number whose throughput is within
+                                10% of the best one. It acts as `n` with `concurrency` or in nested calls.
 
         tag (string): A tag to be prefixed to the output. Helpful when chaining `map` operations.
 
@@ -168,11 +505,95 @@ def _map(
                                             not faster than the actual processing rate. Set to `None` to
                                             deactivate.
 
+        serializer (string): If set, `func`, the `data` items, and the results are serialized with either `pickle`
+                             (protocol 5) or `cloudpickle` (also supports lambdas and closures). The number of
+                             transferred bytes is reported after processing finished. If `None`, the default
+                             pickling of the `multiprocessing` module is used.
+
+        compress (bool or int): If set, large payloads are compressed with zlib when using a `serializer`. An int
+                                is used as compression level.
+
+        start_method (string): The start method of the pool workers, i.e. `fork`, `spawn`, or `forkserver`.
+                              If `None`, the platform default is used. The startup time of the workers is
+                              reported in the start message.
+
+        preload (list): Names of modules that the fork server imports once so that the workers start with
+                        them already imported. Implies the `forkserver` start method.
+
+        pin_workers (bool): If `True`, every worker is pinned to a distinct available CPU.
+
+        limit_threads (bool): If `True`, the workers cap the thread pools of OpenMP, MKL, and OpenBLAS so that
+                              the total number of threads matches the number of available CPUs.
+
+        profile (bool or string): If set, `func` is profiled with cProfile inside the workers and the functions
+                                  with the most own time are reported after the finish message. If a path is
+                                  given, the merged stats are also written there for use with `pstats`.
+
+        profile_sample_rate (float): The fraction of calls that is profiled to limit the overhead on long runs.
+
+        concurrency (string): If `adaptive`, the items are dispatched one by one and the number of in-flight
+                              items is adjusted between 1 and the number of `processes` based on their
+                              processing time: it grows while the time stays close to the best one seen and
+                              shrinks when it rises. This suits I/O-bound functions against backends that
+                              slow down under load. Set `processes` to the maximal concurrency.
+
+        max_rate (int or float): If set, no more than this number of items per second is dispatched.
+
+        spill_to (string): A directory for results that exceed the `spill_memory_budget`. If set, a lazy sequence
+                           is returned that supports `len()`, indexing, and iteration and loads the results
+                           written to disk through a memory map only when they are accessed. The file is
+                           removed when the sequence is garbage collected.
+
+        spill_memory_budget (int): The number of bytes of pickled results kept in memory when using `spill_to`.
+                                   The results are pickled by the workers, or with a `serializer` its payload
+                                   sizes are counted, so that the parent does not pickle them again.
+
+        backend (string): Either `pool` to use a local process pool or `cluster` to distribute the items to
+                          `busybee worker --connect host:port` processes on other machines. The latter always
+                          uses a serializer and ignores `processes`, `start_method`, `preload`, `profile`,
+                          `concurrency`, and `max_rate`.
+
+        cluster_address (string): The `host:port` the driver listens on for workers of the `cluster` backend.
+
+        cluster_authkey (string or bytes): The shared secret of the driver and the workers of the `cluster`
+                                           backend. Defaults to the `BUSYBEE_AUTHKEY` environment variable.
+
+        cluster_heartbeat_timeout (int or float): Chunks of a worker of the `cluster` backend are re-dispatched
+                                                  to other workers if it did not send a heartbeat for this
+                                                  number of seconds.
+
+        cluster_idle_timeout (int or float): The run of the `cluster` backend fails with a `TimeoutError` if no
+                                             worker was connected for this number of seconds. Set to `None` to
+                                             wait forever.
+
+        nested (string): How a call of `map` inside `func` runs, as the pool workers cannot start processes of
+                         their own. With `threads`, it runs in threads of the worker: one on the slot the worker
+                         holds and one per slot of idle workers of the outermost pool, up to `processes`. Thus,
+                         all levels together use no more than the processes of the outermost call. Note that
+                         the threads only run in parallel where `func` releases the GIL, e.g. for I/O. With
+                         `serial`, it runs in a single thread. Nested calls do not use the `serializer`,
+                         `profile`, or `cluster` backend.
+
+        auto_cache (string): A JSON file that stores the choice of `processes="auto"` per function name and
+                             number of CPUs. Subsequent calls of the same function use the stored choice
+                             instead of probing.
+
+        _handle: Internal. The `map_async` handle that observes this run.
+
+        _item_sizes (list): Internal. The size in bytes of every item. If given, progress is tracked in bytes.
+
     Raises:
-        ValueError: If an invalid specification is provided to the `processes` argument
+        ValueError: If an invalid specification is provided to the `processes`, `serializer`, `start_method`,
+                    `preload`, `concurrency`, `max_rate`, `backend`, `nested`, or `cluster_*` arguments
+
+        CancelledError: If the run was cancelled through its `map_async` handle
+
+        TimeoutError: If no worker of the `cluster` backend was connected for `cluster_idle_timeout` seconds
+
+        Any exception raised by `func`, also on the workers of the `cluster` backend
 
     Returns:
-        The processed list with items following the order of the original list.
+        The processed list with items following the order of the original list. A lazy sequence with `spill_to`.
     """
     # internal wrapper for output
     def println(string):
@@ -185,53 +606,251 @@ def _map(
         println("%s: skipping because of empty input" % tag)
         return []
 
+    # setup: the cluster backend always serializes as the items are sent over the network
+    if backend not in _BACKENDS:
+        raise __VALUE_ERROR_INVALID_BACKEND
+    if backend == "cluster":
+        serializer = serializer or "pickle"
+
+    # setup: a nested call inside a pool worker runs in threads that share the memory of the worker
+    if nested not in _NESTED_MODES:
+        raise __VALUE_ERROR_INVALID_NESTED
+    nested_call = _in_pool_worker()
+    if nested_call:
+        backend, serializer, profile = "pool", None, False
+
+    # setup: with `auto`, the scaling is probed on the first items unless a choice is stored
+    probe_scaling = False
+    if processes == "auto":
+        processes = "n"
+        if backend == "pool" and concurrency is None and not nested_call:
+            auto_key = _choice_key(func, _available_cpu_count())
+            stored = _load_choice(auto_cache, auto_key) if auto_cache else None
+            processes, probe_scaling = (stored, False) if stored else ("n", True)
+
+    # setup: the dispatch of single items can be controlled by the number of in-flight items and a rate
+    if concurrency not in _CONCURRENCY_MODES:
+        raise __VALUE_ERROR_INVALID_CONCURRENCY
+    token_bucket = _TokenBucket(max_rate) if max_rate else None
+
+    # setup: serialization
+    if serializer:
+        serializer = _Serializer(serializer, compress=compress)
+        func_payload = serializer.dumps(func)
+
+    # setup: profiling of the pool workers
+    profile_dir = None
+    if profile and backend == "pool":
+        profile_dir = tempfile.mkdtemp(prefix="busybee-profile-")
+
     # setup: multiprocessing
-    num_processes = _parse_core_spec(processes)
-    pool = mp.Pool(processes=num_processes)
+    num_borrowed = 0
+    if nested_call:
+        if nested == "threads":
+            num_borrowed = _borrow_slots(
+                _worker.get("slots"),
+                _parse_core_spec(processes) - 1,
+                _worker.get("num_unstarted"),
+            )
+        num_processes = 1 + num_borrowed
+        pool, startup_time = _start_thread_pool(num_processes), None
+    elif backend == "cluster":
+        cluster = _ClusterDriver(
+            cluster_address,
+            cluster_authkey,
+            heartbeat_timeout=cluster_heartbeat_timeout,
+            idle_timeout=cluster_idle_timeout,
+        )
+        cluster.start(serializer, func_payload)
+        num_processes = 1
+    else:
+        num_processes = _parse_core_spec(processes)
+        worker_config = {}
+        if serializer:
+            worker_config.update(serializer=serializer, func_payload=func_payload)
+        if limit_threads:
+            worker_config.update(threads=max(1, _available_cpu_count() // num_processes))
+        if profile_dir:
+            worker_config.update(profile_dir=profile_dir, profile_sample_rate=profile_sample_rate)
+        pool, startup_time = _start_pool(
+            num_processes,
+            worker_config,
+            start_method=start_method,
+            preload=preload,
+            pin_workers=pin_workers,
+            num_items=len(data),
+        )
+
+    # setup: the in-flight items are limited adaptively, by the scaling probe, or, if only the rate is limited, fixed
+    concurrency_limit = None
+    if backend == "pool" and concurrency == "adaptive":
+        concurrency_limit = _ConcurrencyLimit(max_limit=num_processes)
+    elif backend == "pool" and probe_scaling:
+        def on_choice(probe):
+            println(_auto_string(probe.throughputs, probe.choice, tag))
+            if auto_cache and probe.throughputs:
+                _store_choice(auto_cache, auto_key, probe.choice)
+
+        concurrency_limit = _ScalingProbe(num_processes, max_items=max(1, len(data) // 5), on_choice=on_choice)
+    elif backend == "pool" and token_bucket:
+        concurrency_limit = _ConcurrencyLimit(max_limit=num_processes, min_limit=num_processes)
 
     # setup: internal state
     num_total = len(data)
     chunksize = max(1, num_total // 1000)
     time_start = time.time()
 
+    # setup: progress is tracked in items or, with `_item_sizes`, in bytes
+    in_bytes = _item_sizes is not None
+    progress_total = sum(_item_sizes) if in_bytes else num_total
+    progress_processed = 0
+
     # setup: the update_limit decides when to print progress update messages
     update_limit = _ProgressUpdateLimit(
         time_start=time_start,
-        num_total=num_total,
+        num_total=progress_total,
         every_n_seconds=update_every_n_seconds,
         every_n_percent=update_every_n_percent
     )
 
     # before execution
-    println(_start_string(num_total, tag, num_processes))
+    if nested_call:
+        println(_nested_start_string(progress_total, tag, num_processes, in_bytes=in_bytes))
+    elif backend == "cluster":
+        println(_cluster_start_string(progress_total, tag, cluster_address, in_bytes=in_bytes))
+    else:
+        println(_start_string(progress_total, tag, num_processes, startup_time, in_bytes=in_bytes))
     total_cpu_time = 0.0
 
-    # actual execution
-    result = []
-    meta_args = [(func, d) for d in data]
-    for idx, r in enumerate(pool.imap(_meta_func, meta_args, chunksize=chunksize)):
-        out, time_delta = r
-        result.append(out)
-
-        num_processed = idx + 1
-        total_cpu_time += time_delta
-
-        if update_limit.should_print(num_processed):
-            println(_progress_string(
-                total_cpu_time,
-                num_processed,
-                num_total,
-                num_processes,
-                tag)
-            )
-
-    # after execution
-    println(_finish_string(time_start, total_cpu_time, num_total, tag))
+    # setup: a handle of `map_async` observes the progress and may request cancellation
+    should_stop = _handle.cancel_requested if _handle else lambda: False
+    if _handle:
+        _handle.num_total = progress_total
+        _handle.num_processes = num_processes
+    completed = False
+
+    # setup: with a serializer the items are serialized lazily and the transferred bytes are counted
+    bytes_sent, bytes_received = 0, 0
+    if serializer:
+        def serialized_data():
+            nonlocal bytes_sent
+            for d in data:
+                payload = serializer.dumps(d)
+                bytes_sent += _payload_size(payload)
+                yield payload
+
+        worker_func, meta_args = _meta_func_serialized, serialized_data()
+    else:
+        # the pool workers pickle results to be spilled as they would be pickled for the transfer anyway
+        if nested_call:
+            worker_func = _meta_func_threaded
+        elif spill_to:
+            worker_func = _meta_func_pickled
+        else:
+            worker_func = _meta_func
+        meta_args = [(func, d) for d in data]
 
-    # clean up! See: https://bugs.python.org/issue34172 - Python
-    # does NOT terminate the background pool processes by default even
-    # though the documentation claims it does so when being GCed.
-    pool.close()
+    try:
+        # setup: both backends yield `(idx, out, time_delta)` tuples; only the pool keeps the order
+        if backend == "cluster":
+            outputs = cluster.imap_unordered(meta_args, chunksize, should_stop=should_stop)
+        elif probe_scaling:
+            outputs = _imap_probed(
+                pool,
+                worker_func,
+                meta_args,
+                concurrency_limit,
+                chunksize,
+                token_bucket=token_bucket,
+                should_stop=should_stop,
+            )
+        elif concurrency_limit:
+            outputs = _imap_windowed(
+                pool,
+                worker_func,
+                meta_args,
+                concurrency_limit,
+                token_bucket=token_bucket,
+                should_stop=should_stop,
+            )
+        else:
+            outputs = _imap(pool, worker_func, meta_args, chunksize, should_stop=should_stop)
+
+        # actual execution
+        if spill_to:
+            result = _SpillingList(num_total, spill_to, spill_memory_budget)
+        else:
+            result = [None] * num_total
+        for idx, out, time_delta in outputs:
+            out_size = None
+            if serializer:
+                out_size = _payload_size(out)
+                bytes_received += out_size
+                out = serializer.loads(out)
+            if worker_func is _meta_func_pickled:
+                result.put_record(idx, out)
+            elif spill_to:
+                result.put(idx, out, size=out_size)
+            else:
+                result[idx] = out
+
+            progress_processed += _item_sizes[idx] if in_bytes else 1
+            total_cpu_time += time_delta
+            if backend == "cluster":
+                num_processes = max(1, cluster.num_workers)
+            elif concurrency_limit:
+                num_processes = concurrency_limit.current()
+
+            if _handle:
+                _handle.num_processed = progress_processed
+                _handle.num_processes = num_processes
+                _handle.total_cpu_time = total_cpu_time
+
+            if update_limit.should_print(progress_processed):
+                println(_progress_string(
+                    total_cpu_time,
+                    progress_processed,
+                    progress_total,
+                    num_processes,
+                    tag,
+                    in_bytes=in_bytes)
+                )
+
+        # after execution
+        println(_finish_string(time_start, total_cpu_time, progress_total, tag, in_bytes=in_bytes))
+        if serializer:
+            bytes_sent += _payload_size(func_payload) * num_processes
+            println(_transfer_string(bytes_sent, bytes_received, tag))
+        completed = True
+
+    finally:
+        # clean up! See: https://bugs.python.org/issue34172 - Python
+        # does NOT terminate the background pool processes by default even
+        # though the documentation claims it does so when being GCed.
+        if backend == "cluster":
+            cluster.close()
+        elif completed:
+            pool.close()
+        else:
+            # outstanding work of a failed or cancelled run is of no use
+            pool.terminate()
+            pool.join()
+
+        if num_borrowed:
+            _release_slots(_worker["slots"], num_borrowed)
+
+        if profile_dir and not completed:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+    # the workers dump their profiles when they exit
+    if profile_dir:
+        pool.join()
+        stats = _merge_profiles(profile_dir)
+        if stats is not None:
+            println(_profile_string(stats, tag))
+            if isinstance(profile, str):
+                stats.dump_stats(profile)
+        shutil.rmtree(profile_dir, ignore_errors=True)
 
     return result
 
@@ -245,6 +864,7 @@ def _filter(
     stdout=sys.stdout,
     update_every_n_seconds=5,
     update_every_n_percent=50,
+    **kwargs
 ):
     """Applies the given `func` to every item in `data` using up to the number of processes
     specified by `processes`. Returns all `data` items where `func` evaluates `True`.
@@ -256,7 +876,7 @@ def _filter(
         data (list): The data that is processed by `func`. This must provide random access and `len()` support.
                      Ideally this is a simple list.
 
-        For the other arguments see the map(...) function.
+        For the other arguments and further keyword arguments see the map(...) function.
 
     Returns:
         The filterred items following the order of the original list.
@@ -270,6 +890,7 @@ def _filter(
         stdout=stdout,
         update_every_n_seconds=update_every_n_seconds,
         update_every_n_percent=update_every_n_percent,
+        **kwargs
     )
 
     result = [item for idx, item in enumerate(data) if is_included[idx]]
@@ -285,6 +906,7 @@ def _mk_dict(
     stdout=sys.stdout,
     update_every_n_seconds=5,
     update_every_n_percent=50,
+    **kwargs
 ):
     """Creates a new dictionary with the given `keys` and values as the application of `func`
     to the individual key.
@@ -296,7 +918,7 @@ def _mk_dict(
         keys (list): The keys of the new dictionary. This must provide random access and `len()` support.
                      Ideally this is a simple list.
 
-        For the other arguments see the map(...) function.
+        For the other arguments and further keyword arguments see the map(...) function.
 
     Returns:
         The a new dictionary with the given `keys` and values as `func(keys)`.
@@ -314,6 +936,7 @@ def _mk_dict(
         stdout=stdout,
         update_every_n_seconds=update_every_n_seconds,
         update_every_n_percent=update_every_n_percent,
+        **kwargs
     )
 
     return dict(zip(unique_keys, values))
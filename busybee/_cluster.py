@@ -0,0 +1,393 @@
+"""This file provides the `cluster` backend. The driver runs a coordinator in a
+`multiprocessing.managers` server that hands out chunks of serialized items to
+`busybee worker` processes, which may run on other machines and connect via TCP.
+"""
+
+import collections
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError
+from multiprocessing.managers import BaseManager
+from multiprocessing.pool import ExceptionWithTraceback
+
+_HEARTBEAT_INTERVAL = 1.0
+
+# Number of chunks per connected worker that are sent to the coordinator ahead of the results
+_CHUNKS_AHEAD_PER_WORKER = 2
+
+_AUTHKEY_ENV = "BUSYBEE_AUTHKEY"
+
+__VALUE_ERROR_INVALID_ADDRESS = ValueError(
+    "Invalid cluster address! Try: `localhost:7392`, `0.0.0.0:7392`")
+
+
+def _parse_address(address):
+    """Parses an address of the form `host:port` into a `(host, port)` tuple. An empty
+    host is treated as `0.0.0.0`, i.e. listening on all interfaces.
+
+    Raises:
+        ValueError: When given an invalid address
+    """
+    host, sep, port = str(address).rpartition(":")
+    if not sep:
+        raise __VALUE_ERROR_INVALID_ADDRESS
+
+    try:
+        port = int(port)
+    except ValueError:
+        raise __VALUE_ERROR_INVALID_ADDRESS
+
+    return (host or "0.0.0.0", port)
+
+
+def _resolve_authkey(authkey):
+    """Returns the given `authkey` as bytes or falls back to the `BUSYBEE_AUTHKEY`
+    environment variable.
+
+    Raises:
+        ValueError: When neither is set
+    """
+    authkey = authkey or os.environ.get(_AUTHKEY_ENV)
+    if not authkey:
+        raise ValueError(
+            "The cluster backend requires an authkey or the %s environment variable" % _AUTHKEY_ENV)
+    return authkey.encode() if isinstance(authkey, str) else authkey
+
+
+class _ChunkError():
+    """Takes the place of the results of a chunk for which `func` raised. The `payload` is the
+    serialized exception including the traceback of the worker.
+    """
+
+    def __init__(self, payload):
+        self.payload = payload
+
+
+class _Coordinator():
+    """Lives in the manager server and tracks the chunks of the current job. Chunks are
+    assigned to workers on request and are re-dispatched when the assigned worker did
+    not send a heartbeat within `heartbeat_timeout` seconds.
+    """
+
+    def __init__(self, heartbeat_timeout=10.0):
+        self.heartbeat_timeout = heartbeat_timeout
+
+        self._lock = threading.Condition()
+        self._job = None
+        self._finished = False
+
+        self._pending = collections.deque()
+        self._assigned = {}
+        self._done = set()
+        self._results = queue.Queue()
+        self._last_seen = {}
+
+    def start_job(self, job_id, serializer, func_payload):
+        with self._lock:
+            self._job = (job_id, serializer, func_payload)
+
+    def get_job(self, worker_id):
+        """Returns `(job_id, serializer, func_payload)` or `None` if no job is running."""
+        with self._lock:
+            if self._finished:
+                return None
+            self._last_seen[worker_id] = time.time()
+            return self._job
+
+    def finish_job(self):
+        with self._lock:
+            self._finished = True
+            self._lock.notify_all()
+
+    def put_chunk(self, chunk_id, payloads):
+        with self._lock:
+            self._pending.append((chunk_id, payloads))
+            self._lock.notify()
+
+    def get_chunk(self, worker_id, timeout=1.0):
+        """Returns `(chunk_id, payloads)` for the worker, `None` if there is currently nothing
+        to do, or `False` if the job is finished.
+        """
+        with self._lock:
+            self._last_seen[worker_id] = time.time()
+            if not self._pending and not self._finished:
+                self._lock.wait(timeout)
+            if self._finished:
+                return False
+            if not self._pending:
+                return None
+
+            chunk = self._pending.popleft()
+            self._assigned[chunk[0]] = (worker_id, chunk)
+            return chunk
+
+    def put_results(self, worker_id, chunk_id, results):
+        with self._lock:
+            self._last_seen[worker_id] = time.time()
+            if chunk_id in self._done:
+                return
+
+            self._done.add(chunk_id)
+            self._assigned.pop(chunk_id, None)
+            self._pending = collections.deque(
+                c for c in self._pending if c[0] != chunk_id)
+        self._results.put((chunk_id, results))
+
+    def put_error(self, worker_id, chunk_id, error_payload):
+        """Reports that `func` raised for the chunk. The serialized exception is returned by
+        `get_results` as a `_ChunkError` in place of the results.
+        """
+        self.put_results(worker_id, chunk_id, _ChunkError(error_payload))
+
+    def heartbeat(self, worker_id):
+        with self._lock:
+            self._last_seen[worker_id] = time.time()
+
+    def get_results(self, timeout=0.5, current_time=None):
+        """Re-dispatches the chunks of dead workers and returns `(results, num_workers)`
+        where `results` is a list of `(chunk_id, results)` tuples that arrived in the
+        meantime. The results of a chunk for which `func` raised are a `_ChunkError`. Waits
+        up to `timeout` seconds for the first result.
+        """
+        self._redispatch_dead_workers(current_time or time.time())
+
+        results = []
+        try:
+            results.append(self._results.get(timeout=timeout))
+            while True:
+                results.append(self._results.get_nowait())
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            return results, len(self._last_seen)
+
+    def _redispatch_dead_workers(self, current_time):
+        with self._lock:
+            dead = [w for w, t in self._last_seen.items()
+                    if current_time - t > self.heartbeat_timeout]
+            for worker_id in dead:
+                del self._last_seen[worker_id]
+
+            for chunk_id, (worker_id, chunk) in list(self._assigned.items()):
+                if worker_id in dead:
+                    del self._assigned[chunk_id]
+                    self._pending.appendleft(chunk)
+                    self._lock.notify()
+
+
+# The coordinator of the manager server process. It is set up by `_init_coordinator`.
+_coordinator = None
+
+
+def _init_coordinator(heartbeat_timeout):
+    global _coordinator
+    _coordinator = _Coordinator(heartbeat_timeout=heartbeat_timeout)
+
+
+def _get_coordinator():
+    return _coordinator
+
+
+class _ClusterManager(BaseManager):
+    pass
+
+
+_ClusterManager.register("coordinator", callable=_get_coordinator)
+
+
+class _ClusterDriver():
+    """Runs the manager server on the driver side and distributes the serialized items
+    to the connected workers. If no worker is connected for `idle_timeout` seconds, the
+    run fails.
+    """
+
+    def __init__(self, address, authkey, heartbeat_timeout=10.0, idle_timeout=None):
+        self.address = _parse_address(address)
+        self.authkey = _resolve_authkey(authkey)
+        self.heartbeat_timeout = heartbeat_timeout
+        self.idle_timeout = idle_timeout
+        self.num_workers = 0
+
+        self._manager = None
+        self._coordinator = None
+        self._serializer = None
+
+    def start(self, serializer, func_payload):
+        self._manager = _ClusterManager(
+            address=self.address, authkey=self.authkey)
+        self._manager.start(
+            initializer=_init_coordinator,
+            initargs=(self.heartbeat_timeout,),
+        )
+        self._coordinator = self._manager.coordinator()
+        self._serializer = serializer
+        self._coordinator.start_job(uuid.uuid4().hex, serializer, func_payload)
+
+    def imap_unordered(self, payloads, chunksize, should_stop=lambda: False):
+        """Yields `(idx, result_payload, time_delta)` tuples as the results arrive from
+        the workers. Every item is yielded exactly once even if chunks are re-dispatched.
+        The `payloads` are consumed lazily such that no more than two chunks per connected
+        worker are outstanding at the coordinator.
+
+        Raises:
+            CancelledError: If `should_stop` returns `True`
+            TimeoutError: If no worker was connected for `idle_timeout` seconds
+            Any exception raised by `func` on a worker
+        """
+        payloads = iter(payloads)
+        num_chunks, exhausted = 0, False
+        remaining = set()
+        time_last_worker = time.time()
+        while not exhausted or remaining:
+            if should_stop():
+                raise CancelledError()
+
+            while not exhausted and len(remaining) < _CHUNKS_AHEAD_PER_WORKER * max(1, self.num_workers):
+                chunk = list(itertools.islice(payloads, chunksize))
+                if not chunk:
+                    exhausted = True
+                    break
+                self._coordinator.put_chunk(num_chunks, chunk)
+                remaining.add(num_chunks)
+                num_chunks += 1
+
+            if not remaining:
+                continue
+
+            results, self.num_workers = self._coordinator.get_results()
+            if self.num_workers > 0:
+                time_last_worker = time.time()
+            elif self.idle_timeout and time.time() - time_last_worker > self.idle_timeout:
+                raise TimeoutError("No cluster worker connected for %ss" % self.idle_timeout)
+
+            for chunk_id, chunk_results in results:
+                if chunk_id not in remaining:
+                    continue
+                remaining.remove(chunk_id)
+
+                if isinstance(chunk_results, _ChunkError):
+                    raise self._serializer.loads(chunk_results.payload)
+
+                for offset, (result_payload, time_delta) in enumerate(chunk_results):
+                    yield chunk_id * chunksize + offset, result_payload, time_delta
+
+    def close(self):
+        if self._manager is None:
+            return
+
+        try:
+            self._coordinator.finish_job()
+        finally:
+            self._manager.shutdown()
+            self._manager = None
+
+
+def _run_workers(address, authkey, num_processes, retry_seconds=60.0):
+    """Runs `num_processes` worker processes that connect to the driver at `address`."""
+    _parse_address(address)
+    authkey = _resolve_authkey(authkey)
+    if num_processes == 1:
+        _run_worker(address, authkey, retry_seconds)
+        return
+
+    workers = [
+        mp.Process(target=_run_worker, args=(address, authkey, retry_seconds))
+        for _ in range(num_processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def _run_worker(address, authkey, retry_seconds=60.0):
+    """Connects to the driver at `address` and processes chunks until no driver could
+    be reached for `retry_seconds`. Workers survive the end of a job and pick up the
+    next job of the driver.
+    """
+    # imported here as the `_busybee` module depends on this one
+    from ._busybee import _meta_func
+
+    address = _parse_address(address)
+    authkey = _resolve_authkey(authkey)
+    worker_id = "%s:%d" % (socket.gethostname(), os.getpid())
+
+    finished_jobs = set()
+    time_last_contact = time.time()
+    while time.time() - time_last_contact < retry_seconds:
+        try:
+            manager = _ClusterManager(address=address, authkey=authkey)
+            manager.connect()
+            coordinator = manager.coordinator()
+            job = coordinator.get_job(worker_id)
+        except (OSError, EOFError):
+            time.sleep(0.5)
+            continue
+
+        time_last_contact = time.time()
+        if job is None or job[0] in finished_jobs:
+            time.sleep(0.5)
+            continue
+
+        job_id, serializer, func_payload = job
+        func = serializer.loads(func_payload)
+
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=_heartbeat_loop,
+            args=(coordinator, worker_id, stop_heartbeat),
+            daemon=True,
+        )
+        heartbeat.start()
+        try:
+            while True:
+                chunk = coordinator.get_chunk(worker_id)
+                if chunk is False:
+                    break
+                if chunk is None:
+                    continue
+
+                chunk_id, payloads = chunk
+                try:
+                    results = []
+                    for payload in payloads:
+                        out, time_delta = _meta_func((func, serializer.loads(payload)))
+                        results.append((serializer.dumps(out), time_delta))
+                except Exception as e:
+                    # the driver re-raises the exception as the pool backend does
+                    coordinator.put_error(worker_id, chunk_id, _dump_error(serializer, e))
+                else:
+                    coordinator.put_results(worker_id, chunk_id, results)
+                time_last_contact = time.time()
+        except (OSError, EOFError):
+            pass
+        finally:
+            stop_heartbeat.set()
+
+        finished_jobs.add(job_id)
+        time_last_contact = time.time()
+
+
+def _dump_error(serializer, e):
+    """Returns the serialized exception `e` including its traceback. Exceptions that cannot be
+    serialized are replaced by a `RuntimeError` with their representation.
+    """
+    try:
+        return serializer.dumps(ExceptionWithTraceback(e, e.__traceback__))
+    except Exception:
+        return serializer.dumps(ExceptionWithTraceback(RuntimeError(repr(e)), e.__traceback__))
+
+
+def _heartbeat_loop(coordinator, worker_id, stop_event):
+    while not stop_event.wait(_HEARTBEAT_INTERVAL):
+        try:
+            coordinator.heartbeat(worker_id)
+        except (OSError, EOFError):
+            return
@@ -0,0 +1,122 @@
+"""This file provides the controllers that decide how many items are in flight at
+the same time and how fast new items are dispatched. They are used for I/O-bound
+functions where the optimal concurrency depends on the backend being accessed."""
+
+import time
+
+
+class _ConcurrencyLimit():
+    """An AIMD controller for the number of in-flight items based on the latency of
+    the individual items. As long as the smoothed latency stays within `tolerance`
+    times the baseline latency, the limit grows additively by about one per round of
+    `limit` completed items. Otherwise, it shrinks multiplicatively by `backoff` at
+    most once per round. The baseline is the minimal latency seen. Every `probe_interval`
+    items, the limit drops to `min_limit` briefly and the baseline is measured again over
+    `probe_size` items so that it follows a backend whose unloaded latency changed. The
+    items still in flight from before the drop are not measured. Afterwards, the previous
+    limit is restored.
+
+    With `min_limit == max_limit` the limit is fixed.
+    """
+
+    def __init__(self, max_limit, min_limit=1, tolerance=1.5, backoff=0.75, smoothing=0.2, probe_interval=500,
+                 probe_size=3):
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.limit = float(self.min_limit)
+
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.probe_interval = probe_interval
+        self.probe_size = probe_size
+
+        self.baseline_latency = None
+        self.latency = None
+        self.completed = 0
+        self.completed_since_decrease = 0
+
+        # the limit to restore, the items to skip, and the items measured while probing
+        self.probe_restore_limit = None
+        self.probe_skip = 0
+        self.probe_measured = 0
+
+    def current(self):
+        """Returns the current number of items that may be in flight."""
+        return int(self.limit)
+
+    def update(self, latency):
+        """Updates the limit with the `latency` of a completed item in seconds."""
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.smoothing * (latency - self.latency)
+
+        self.completed += 1
+        self.completed_since_decrease += 1
+
+        if self.probe_restore_limit is not None:
+            self._update_probe(latency)
+            return
+
+        if self.completed % self.probe_interval == 0:
+            self.probe_restore_limit = self.limit
+            self.probe_skip = int(self.limit)
+            self.probe_measured = 0
+            self.baseline_latency = None
+            self.limit = float(self.min_limit)
+            return
+
+        if self.baseline_latency is None:
+            self.baseline_latency = latency
+        else:
+            self.baseline_latency = min(latency, self.baseline_latency)
+
+        if self.latency <= self.baseline_latency * self.tolerance:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        elif self.completed_since_decrease >= self.limit:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            self.completed_since_decrease = 0
+
+    def _update_probe(self, latency):
+        if self.probe_skip > 0:
+            self.probe_skip -= 1
+            return
+
+        if self.baseline_latency is None:
+            self.baseline_latency = latency
+        else:
+            self.baseline_latency = min(latency, self.baseline_latency)
+
+        self.probe_measured += 1
+        if self.probe_measured >= self.probe_size:
+            self.limit = self.probe_restore_limit
+            self.probe_restore_limit = None
+            self.completed_since_decrease = 0
+
+
+class _TokenBucket():
+    """Limits the dispatch to `rate` items per second with bursts of up to `burst` items."""
+
+    def __init__(self, rate, burst=1, current_time=lambda: time.time()):
+        if rate <= 0:
+            raise ValueError("The max_rate must be positive")
+
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.time_last_update = current_time()
+        self.current_time = current_time
+
+    def delay(self):
+        """Takes a token and returns 0 if one is available. Otherwise, returns the number of
+        seconds until the next token becomes available.
+        """
+        now = self.current_time()
+        self.tokens = min(self.burst, self.tokens + (now - self.time_last_update) * self.rate)
+        self.time_last_update = now
+
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
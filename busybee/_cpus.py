@@ -0,0 +1,120 @@
+"""This file provides methods to detect the CPUs that are actually available to the
+current process (honoring CPU affinity and cgroup quotas of containers) and to limit
+the resources used by the individual workers."""
+
+import math
+import os
+
+try:
+    import threadpoolctl
+except ImportError:  # pragma: no cover
+    threadpoolctl = None
+
+_CGROUP_ROOT = "/sys/fs/cgroup"
+
+# Environment variables that control the size of the thread pools of NumPy and friends
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def _available_cpus():
+    """Returns the sorted list of CPU ids the current process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))  # pragma: no cover
+
+
+def _cgroup_cpu_limit(cgroup_root=_CGROUP_ROOT):
+    """Returns the number of CPUs granted by the cgroup v2 or v1 CPU quota rounded up
+    or `None` if there is no quota.
+    """
+    # cgroup v2: `cpu.max` contains "<quota> <period>" or "max <period>"
+    try:
+        with open(os.path.join(cgroup_root, "cpu.max")) as f:
+            quota, period = f.read().split()[:2]
+        if quota == "max":
+            return None
+        return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+
+    # cgroup v1: `cfs_quota_us` is -1 if there is no quota
+    for cpu_dir in ("cpu", "cpu,cpuacct"):
+        try:
+            with open(os.path.join(cgroup_root, cpu_dir, "cpu.cfs_quota_us")) as f:
+                quota = int(f.read())
+            with open(os.path.join(cgroup_root, cpu_dir, "cpu.cfs_period_us")) as f:
+                period = int(f.read())
+        except (OSError, ValueError):
+            continue
+        if quota <= 0 or period <= 0:
+            return None
+        return max(1, math.ceil(quota / period))
+
+    return None
+
+
+def _available_cpu_count(cgroup_root=_CGROUP_ROOT):
+    """Returns the number of CPUs available to the current process. Unlike `mp.cpu_count()`
+    this honors the CPU affinity and the cgroup CPU quota, e.g. inside a Kubernetes pod.
+    """
+    count = len(_available_cpus())
+
+    limit = _cgroup_cpu_limit(cgroup_root)
+    if limit is not None:
+        count = min(count, limit)
+
+    return max(1, count)
+
+
+def _cap_thread_env(num_threads):
+    """Caps the thread pools of OpenMP, MKL, and OpenBLAS to `num_threads` by setting the
+    respective environment variables unless they are already set to a lower value. This
+    affects libraries loaded afterwards and child processes started afterwards.
+
+    Returns:
+        dict: The previous values of the changed variables (`None` if unset)
+    """
+    previous = {}
+    for var in _THREAD_ENV_VARS:
+        try:
+            if int(os.environ[var]) <= num_threads:
+                continue
+        except (KeyError, ValueError):
+            pass
+        previous[var] = os.environ.get(var)
+        os.environ[var] = str(num_threads)
+
+    return previous
+
+
+def _restore_thread_env(previous):
+    """Restores the environment variables changed by `_cap_thread_env`."""
+    for var, value in previous.items():
+        if value is None:
+            os.environ.pop(var, None)
+        else:
+            os.environ[var] = value
+
+
+def _limit_threads(num_threads):
+    """Caps the thread pools of the current process to `num_threads`; see `_cap_thread_env`.
+    If `threadpoolctl` is installed, the thread pools of already loaded libraries are
+    capped as well.
+    """
+    _cap_thread_env(num_threads)
+
+    if threadpoolctl is not None:  # pragma: no cover
+        threadpoolctl.threadpool_limits(limits=num_threads)
+
+
+def _pin_to_cpu(cpus, counter):
+    """Pins the current process to one of the `cpus`. The shared `counter` (a
+    `multiprocessing.Value`) ensures that each worker is assigned a distinct CPU
+    as long as there are enough.
+    """
+    with counter.get_lock():
+        idx = counter.value
+        counter.value += 1
+
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpus[idx % len(cpus)]})
@@ -0,0 +1,177 @@
+"""This file provides `map_lines` which applies a function to every line of one or
+more files. The files are split into byte ranges aligned on newlines and every worker
+reads its own ranges, so that neither the I/O nor the lines go through the parent
+process. The `_map_lines` method is exported on module level through __init__.py."""
+
+import bisect
+import collections.abc
+import glob
+import itertools
+import os
+
+from ._busybee import _map
+
+# Bounds of the automatically chosen size of the byte ranges
+_MIN_RANGE_BYTES = 64 * 1024
+_MAX_RANGE_BYTES = 16 * 1024 * 1024
+
+_READ_BLOCK_BYTES = 64 * 1024
+
+
+def _expand_paths(paths):
+    """Returns the list of files for the given `paths`, which is either a single path, a
+    glob pattern (e.g. `logs/*.txt`) whose matches are sorted, or a list of paths.
+
+    Raises:
+        FileNotFoundError: If a glob pattern does not match any file
+    """
+    if not isinstance(paths, (str, os.PathLike)):
+        return [os.fspath(p) for p in paths]
+
+    path = os.fspath(paths)
+    if not any(c in path for c in "*?["):
+        return [path]
+
+    matches = sorted(p for p in glob.glob(path) if os.path.isfile(p))
+    if not matches:
+        raise FileNotFoundError("No files match the pattern: %s" % path)
+    return matches
+
+
+def _next_line_start(f, pos):
+    """Returns the offset of the first line that starts at or after `pos` in the binary
+    file `f`. Returns the file size if there is none.
+    """
+    f.seek(pos - 1)
+    offset = pos - 1
+    while True:
+        block = f.read(_READ_BLOCK_BYTES)
+        if not block:
+            return offset
+
+        idx = block.find(b"\n")
+        if idx >= 0:
+            return offset + idx + 1
+        offset += len(block)
+
+
+def _split_ranges(paths, range_bytes=None):
+    """Splits the files into `(path, start, end)` byte ranges of about `range_bytes` that
+    start and end at line boundaries. By default, the size is chosen such that there are
+    about 1000 ranges in total.
+    """
+    sizes = [os.path.getsize(path) for path in paths]
+    if range_bytes is None:
+        range_bytes = min(_MAX_RANGE_BYTES, max(_MIN_RANGE_BYTES, sum(sizes) // 1000))
+
+    ranges = []
+    for path, size in zip(paths, sizes):
+        with open(path, "rb") as f:
+            start = 0
+            while start < size:
+                end = size if start + range_bytes >= size else _next_line_start(f, start + range_bytes)
+                ranges.append((path, start, end))
+                start = end
+
+    return ranges
+
+
+class _LineRangeFunc():
+    """Applies `func` to every line of a `(path, start, end)` byte range and returns the
+    list of results. The lines are split as in text mode and do not contain the line
+    terminator. If `encoding` is `None`, the lines are passed as bytes.
+    """
+
+    def __init__(self, func, encoding):
+        self.func = func
+        self.encoding = encoding
+
+    @property
+    def __wrapped__(self):
+        return self.func
+
+    def __call__(self, byte_range):
+        path, start, end = byte_range
+        with open(path, "rb") as f:
+            f.seek(start)
+            lines = f.read(end - start).splitlines()
+
+        if self.encoding:
+            return [self.func(line.decode(self.encoding)) for line in lines]
+        return [self.func(line) for line in lines]
+
+
+class _FlatResults(collections.abc.Sequence):
+    """A lazy view of the results of all lines given the lazy sequence `range_results` of the
+    result lists of the byte ranges, e.g. with `spill_to`. Every result list is loaded once to
+    count the lines. Afterwards, only the result lists that are accessed are loaded again and
+    the most recent one is kept for sequential access.
+    """
+
+    def __init__(self, range_results):
+        self.range_results = range_results
+        self.starts = [0] + list(itertools.accumulate(len(results) for results in range_results))
+
+        self._cached_idx = None
+        self._cached_results = None
+
+    def __len__(self):
+        return self.starts[-1]
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("result index out of range")
+
+        range_idx = bisect.bisect_right(self.starts, idx) - 1
+        if range_idx != self._cached_idx:
+            self._cached_idx, self._cached_results = range_idx, self.range_results[range_idx]
+        return self._cached_results[idx - self.starts[range_idx]]
+
+    def __iter__(self):
+        for results in self.range_results:
+            yield from results
+
+
+def _map_lines(func, paths, encoding="utf-8", range_bytes=None, **kwargs):
+    """Applies the given `func` to every line of the files given by `paths`. The files are split
+    into byte ranges aligned on newlines and each worker reads its own ranges. Progress is
+    reported in bytes.
+
+    Args:
+        func: The function that will be applied to every line. It needs to be pickleable and
+              therefore it must not be a lambda expression unless the `cloudpickle` serializer is used.
+
+        paths (string or list): A path, a glob pattern (e.g. `logs/*.txt`), or a list of paths.
+                                The files of a glob pattern are processed in sorted order.
+
+        encoding (string): The encoding of the files. It must be ASCII-compatible such as `utf-8`
+                           or `latin-1`. If `None`, the lines are passed to `func` as bytes.
+
+        range_bytes (int): The approximate size of the byte ranges. By default, it is chosen such
+                           that there are about 1000 ranges, each between 64kB and 16MB.
+
+        For the other arguments and further keyword arguments see the map(...) function.
+
+    Raises:
+        FileNotFoundError: If a file does not exist or a glob pattern does not match any file
+
+    Returns:
+        The list of results following the order of the lines in the files. A lazy sequence with `spill_to`.
+    """
+    ranges = _split_ranges(_expand_paths(paths), range_bytes)
+
+    results = _map(
+        _LineRangeFunc(func, encoding),
+        ranges,
+        _item_sizes=[end - start for _, start, end in ranges],
+        **kwargs
+    )
+
+    if kwargs.get("spill_to"):
+        return _FlatResults(results)
+    return [out for range_results in results for out in range_results]
@@ -0,0 +1,63 @@
+"""This file provides the worker budget for nested calls, i.e. when `func` itself calls
+`map`. The workers of a pool are daemonic and cannot start processes of their own, so
+a nested call runs in threads of the worker instead. The outermost pool shares a
+semaphore with one slot per process among its workers: a worker holds a slot while
+it runs an item and a nested call borrows the slots of idle workers for additional
+threads, such that all levels together use no more than the configured number of
+processes. Slots are only borrowed once every item of the outermost pool has started,
+as otherwise a worker that is only idle for a moment would wait for the nested call."""
+
+import multiprocessing as mp
+import time
+from multiprocessing.pool import ThreadPool
+
+
+def _in_pool_worker():
+    """Returns `True` if the current process is a daemonic worker, e.g. of a pool, that
+    cannot start processes of its own.
+    """
+    return mp.current_process().daemon
+
+
+def _borrow_slots(slots, max_count, num_unstarted=None):
+    """Takes up to `max_count` slots from the `slots` semaphore without blocking and returns
+    the number of slots taken. Returns 0 if there is no semaphore or if the shared counter
+    `num_unstarted` indicates that items of the outermost pool still wait to be started.
+    """
+    if slots is None:
+        return 0
+    if num_unstarted is not None and num_unstarted.value > 0:
+        return 0
+
+    count = 0
+    while count < max_count and slots.acquire(block=False):
+        count += 1
+    return count
+
+
+def _release_slots(slots, count):
+    """Returns `count` slots to the `slots` semaphore."""
+    for _ in range(count):
+        slots.release()
+
+
+def _start_thread_pool(num_threads):
+    """Returns a pool of `num_threads` threads for a nested call. Its API matches the one of
+    the process pool.
+    """
+    return ThreadPool(processes=num_threads)
+
+
+def _meta_func_threaded(args):
+    """Like `_meta_func` but for the threads of a nested call. These run on slots that are
+    already held and are not profiled.
+
+    Returns a tuple consisting of the `func` return value and the processing time in seconds.
+    """
+    time_start = time.time()
+
+    func, data = args
+    result = func(data)
+
+    time_delta = time.time() - time_start
+    return result, time_delta
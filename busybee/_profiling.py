@@ -0,0 +1,75 @@
+"""This file provides the profiling of `func` inside the pool workers. Every worker
+profiles a sample of its calls and dumps the stats when it exits. The parent then
+merges the stats of all workers into a single report."""
+
+import cProfile
+import glob
+import io
+import os
+import pstats
+from multiprocessing import util
+
+
+class _SampledProfiler():
+    """Profiles a deterministic sample of the calls such that the fraction of profiled
+    calls approaches `sample_rate`. The first call is always profiled.
+    """
+
+    def __init__(self, sample_rate=1.0):
+        self.profile = cProfile.Profile()
+        self.sample_rate = sample_rate
+        self.num_calls = 0
+        self.num_sampled = 0
+
+    def call(self, func, data):
+        """Returns `func(data)` and profiles the call if it is part of the sample."""
+        self.num_calls += 1
+        if self.num_sampled >= self.sample_rate * self.num_calls:
+            return func(data)
+
+        self.num_sampled += 1
+        self.profile.enable()
+        try:
+            return func(data)
+        finally:
+            self.profile.disable()
+
+    def dump(self, path):
+        if self.num_sampled > 0:
+            self.profile.dump_stats(path)
+
+
+def _start_worker_profiler(profile_dir, sample_rate):
+    """Returns a new `_SampledProfiler` for the current worker that dumps its stats into
+    the `profile_dir` when the worker process exits.
+    """
+    profiler = _SampledProfiler(sample_rate)
+    path = os.path.join(profile_dir, "%d.prof" % os.getpid())
+    util.Finalize(profiler, profiler.dump, args=(path,), exitpriority=10)
+    return profiler
+
+
+def _merge_profiles(profile_dir):
+    """Returns the merged `pstats.Stats` of all worker stats in `profile_dir` or `None`
+    if there are none.
+    """
+    paths = sorted(glob.glob(os.path.join(profile_dir, "*.prof")))
+    if not paths:
+        return None
+
+    stats = pstats.Stats(*paths)
+    stats.files = []  # the temporary paths are meaningless in the report
+    return stats
+
+
+def _profile_string(stats, tag, top=10):
+    """Returns the `top` functions of the merged `stats` by their own time. It is
+    prefixed by the `tag`.
+    """
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats("tottime").print_stats(top)
+
+    lines = [l for l in stream.getvalue().splitlines() if l.strip()]
+    header = "%s: Profile of the workers, top %d functions by own time:" % (tag, top)
+    return os.linesep.join([header] + lines)
@@ -0,0 +1,104 @@
+"""This file provides the serializers that can be used to transfer `func`, the
+`data` items, and the results between the parent and the worker processes."""
+
+import pickle
+import zlib
+
+try:
+    import cloudpickle
+except ImportError:  # pragma: no cover
+    cloudpickle = None
+
+_SERIALIZER_NAMES = ("pickle", "cloudpickle")
+
+_PICKLE_PROTOCOL = 5
+
+# Top-level `bytes` and `bytearray` objects are not pickled by the serializer but passed as buffer
+_RAW_TYPES = {"bytes": bytes, "bytearray": bytearray}
+
+
+class _Serializer():
+    """Converts objects into payloads and back. A payload is a tuple of the form
+    `(compressed, main, buffers)` where `main` is the pickle stream and `buffers`
+    are the buffers (e.g. NumPy arrays) that pickle protocol 5 keeps separate from
+    the stream so that they are compressed individually. Objects of type `bytes` and
+    `bytearray` are passed as a single buffer and `main` names their type. Note that
+    the payload is still pickled by the transport, e.g. the `multiprocessing` module,
+    which copies the buffers into its stream.
+
+    Args:
+        name (string): Either `pickle` or `cloudpickle`. The latter also supports
+                       lambdas and closures, but it requires the `cloudpickle` package.
+
+        compress (bool or int): If set, payloads of at least `compress_threshold` bytes
+                                are compressed with zlib. An int is used as compression level.
+
+        compress_threshold (int): The minimum payload size in bytes for compression.
+
+    Raises:
+        ValueError: When given an unknown name or `cloudpickle` is not installed
+    """
+
+    def __init__(self, name="pickle", compress=False, compress_threshold=64 * 1024):
+        if name not in _SERIALIZER_NAMES:
+            raise ValueError("Invalid serializer! Try: %s" % ", ".join(
+                "`%s`" % n for n in _SERIALIZER_NAMES))
+        if name == "cloudpickle" and cloudpickle is None:
+            raise ValueError(
+                "The `cloudpickle` serializer requires the cloudpickle package")
+
+        self.name = name
+        self.compress_level = 0
+        if compress:
+            self.compress_level = 1 if compress is True else int(compress)
+        self.compress_threshold = compress_threshold
+
+    def dumps(self, obj):
+        """Returns the payload for the given `obj`."""
+        if type(obj) in (bytes, bytearray):
+            main, buffers = type(obj).__name__, [obj]
+        else:
+            pickle_buffers = []
+            module = cloudpickle if self.name == "cloudpickle" else pickle
+            main = module.dumps(
+                obj, protocol=_PICKLE_PROTOCOL, buffer_callback=pickle_buffers.append)
+            buffers = [_transportable(b) for b in pickle_buffers]
+
+        if self.compress_level and _payload_size((False, main, buffers)) >= self.compress_threshold:
+            if not isinstance(main, str):
+                main = zlib.compress(main, self.compress_level)
+            buffers = [zlib.compress(b, self.compress_level) for b in buffers]
+            return True, main, buffers
+
+        return False, main, buffers
+
+    def loads(self, payload):
+        """Returns the object for the given `payload` as created by `dumps`."""
+        compressed, main, buffers = payload
+        if compressed:
+            if not isinstance(main, str):
+                main = zlib.decompress(main)
+            buffers = [zlib.decompress(b) for b in buffers]
+
+        if isinstance(main, str):
+            return _RAW_TYPES[main](buffers[0]) if compressed else buffers[0]
+
+        # cloudpickle streams are read by the standard unpickler
+        return pickle.loads(main, buffers=buffers)
+
+
+def _transportable(pickle_buffer):
+    """Returns the contents of the `pickle_buffer` as a writable `bytearray`. Unlike the
+    `PickleBuffer` itself, it can be pickled with any protocol, e.g. by `multiprocessing`.
+    """
+    try:
+        return bytearray(pickle_buffer.raw())
+    except BufferError:  # pragma: no cover
+        return bytearray(memoryview(pickle_buffer).tobytes())
+
+
+def _payload_size(payload):
+    """Returns the size of the given `payload` in bytes."""
+    _, main, buffers = payload
+    main_size = 0 if isinstance(main, str) else len(main)
+    return main_size + sum(memoryview(b).nbytes for b in buffers)
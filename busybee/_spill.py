@@ -0,0 +1,148 @@
+"""This file provides the result storage for outputs that are larger than the
+memory. Results beyond a memory budget are written to a file on disk and are
+read back through a memory map only when they are accessed."""
+
+import collections.abc
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import weakref
+from array import array
+
+_RECORD_HEADER = struct.Struct("<Q")
+
+# Marks results that are kept in memory in the offset index
+_IN_MEMORY = -1
+
+# Results of these types are measured by their length instead of their pickled size
+_SIZED_TYPES = (bytes, bytearray, str)
+
+
+class _SpillingList(collections.abc.Sequence):
+    """A sequence of `num_total` results that keeps results in memory until their pickled
+    size exceeds `memory_budget` bytes. All further results are appended to a file in the
+    directory `spill_dir`, which is removed when the sequence is garbage collected. Results
+    that are already pickled are passed to `put_record`. Unless the size is given to `put`,
+    other results are pickled to measure them, apart from `bytes`, `bytearray`, and `str`
+    results whose length is used.
+
+    Results can be set in any order. Reading supports `len()`, indexing, slicing, and
+    iteration and only loads the results that are accessed.
+    """
+
+    def __init__(self, num_total, spill_dir, memory_budget):
+        self.memory_budget = memory_budget
+        self.memory_used = 0
+        self.num_spilled = 0
+
+        self._items = [None] * num_total
+        self._offsets = array("q", [_IN_MEMORY]) * num_total
+
+        self._spill_file = _SpillFile(spill_dir)
+        self.path = self._spill_file.path
+        weakref.finalize(self, self._spill_file.remove)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __setitem__(self, idx, item):
+        self.put(idx, item)
+
+    def put(self, idx, item, size=None):
+        """Sets the result at `idx`. The `size` in bytes, e.g. of the payload the result was
+        transferred in, avoids pickling results that are kept in memory.
+        """
+        record = None
+        if size is None:
+            if type(item) in _SIZED_TYPES:
+                size = len(item)
+            else:
+                record = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+                size = len(record)
+
+        if self.memory_used + size <= self.memory_budget:
+            self.memory_used += size
+            self._items[idx] = item
+            return
+
+        if record is None:
+            record = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+        self._offsets[idx] = self._spill_file.append(record)
+        self.num_spilled += 1
+
+    def put_record(self, idx, record):
+        """Sets the result at `idx` given as pickled `record`. It is only unpickled if it is
+        kept in memory and written as is otherwise.
+        """
+        if self.memory_used + len(record) <= self.memory_budget:
+            self.memory_used += len(record)
+            self._items[idx] = pickle.loads(record)
+            return
+
+        self._offsets[idx] = self._spill_file.append(record)
+        self.num_spilled += 1
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+
+        offset = self._offsets[idx]
+        if offset == _IN_MEMORY:
+            return self._items[idx]
+
+        return pickle.loads(self._spill_file.read(offset))
+
+    def __repr__(self):
+        return "<busybee result of %d items, %d spilled to %s>" % (
+            len(self), self.num_spilled, self.path)
+
+
+class _SpillFile():
+    """An append-only file of length-prefixed records in the directory `spill_dir` that
+    is read through a memory map.
+    """
+
+    def __init__(self, spill_dir):
+        os.makedirs(spill_dir, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=spill_dir, prefix="busybee-", suffix=".spill")
+        self.file = os.fdopen(fd, "w+b")
+        self.size = 0
+
+        self.mmap = None
+        self.mmap_size = 0
+
+    def append(self, record):
+        """Appends the `record` and returns its offset."""
+        offset = self.size
+        self.file.seek(offset)
+        self.file.write(_RECORD_HEADER.pack(len(record)))
+        self.file.write(record)
+        self.size += _RECORD_HEADER.size + len(record)
+        return offset
+
+    def read(self, offset):
+        """Returns the record at `offset`. The memory map is extended to cover all records
+        appended since the last read.
+        """
+        if self.mmap_size != self.size:
+            self.file.flush()
+            if self.mmap is not None:
+                self.mmap.close()
+            self.mmap = mmap.mmap(self.file.fileno(), self.size, access=mmap.ACCESS_READ)
+            self.mmap_size = self.size
+
+        (length,) = _RECORD_HEADER.unpack_from(self.mmap, offset)
+        start = offset + _RECORD_HEADER.size
+        return self.mmap[start:start + length]
+
+    def remove(self):
+        """Closes and removes the file."""
+        if self.mmap is not None:
+            self.mmap.close()
+        self.file.close()
+        try:
+            os.remove(self.path)
+        except OSError:  # pragma: no cover
+            pass
@@ -4,6 +4,8 @@ during the BusyBee execution."""
 import math
 import time
 
+_BYTES_PER_MB = 1000 * 1000
+
 
 def _relative_time_string(time_seconds, no_ms=False):
     """Converts the given `time_seconds` into a relative, human-readable
@@ -40,46 +42,124 @@ def _relative_time_string(time_seconds, no_ms=False):
     return "%d:%02d:%02dh" % (hours, minutes, seconds)
 
 
-def _start_string(num_total, tag, num_processes):
+def _size_string(num_bytes):
+    """Converts the given `num_bytes` into a human-readable string representation.
+
+    Args:
+        num_bytes (int): The size in bytes to convert
+
+    Returns:
+        String: The string representation is chosen on the value of
+                bytes to be either of the form `999B`, `999.9kB`, `999.9MB`,
+                or `9.9GB`. If `None` is supplied, `-` is returned.
+    """
+    if num_bytes == None:
+        return "-"
+
+    if abs(num_bytes) < 1000:
+        return "%dB" % num_bytes
+
+    for unit in ("kB", "MB"):
+        num_bytes /= 1000.0
+        if abs(num_bytes) < 1000.0:
+            return "%.1f%s" % (num_bytes, unit)
+
+    return "%.1fGB" % (num_bytes / 1000.0)
+
+
+def _amount_string(amount, in_bytes=False):
+    """Returns the given `amount` either as number of items (e.g. `42 items`) or, if
+    `in_bytes` is set, as size (e.g. `4.2MB`).
+    """
+    return _size_string(amount) if in_bytes else "%d items" % amount
+
+
+def _start_string(num_total, tag, num_processes, startup_time=None, in_bytes=False):
     """Returns a string to be displayed before processing begins. It contains
-    the number of total items and the number of processes. It is prefixed by the `tag`.
+    the number of total items, the number of processes, and, if given, the time
+    it took to start them. It is prefixed by the `tag`. If `in_bytes` is set, `num_total`
+    is the number of bytes to process.
 
     Where information are not available or a division by zero would occur, a `-` or `0ms` is returned for
     that field.
     """
-    fmt_string = "{tag}: Start processing {num_total} items with {num_processes} processes..."
+    fmt_string = "{tag}: Start processing {num_total} with {num_processes} processes{startup}..."
     return fmt_string.format(
         tag=tag,
-        num_total=num_total,
+        num_total=_amount_string(num_total, in_bytes),
         num_processes=num_processes,
+        startup="" if startup_time is None else " (startup: %s)" % _relative_time_string(startup_time),
     )
 
 
-def _finish_string(time_start, total_cpu_time, num_total, tag, current_time=lambda: time.time()):
+def _nested_start_string(num_total, tag, num_threads, in_bytes=False):
+    """Returns a string to be displayed before a nested call inside a pool worker begins
+    processing. It contains the number of total items and the number of threads. It is
+    prefixed by the `tag`. If `in_bytes` is set, `num_total` is the number of bytes to process.
+    """
+    fmt_string = "{tag}: Start processing {num_total} nested with {num_threads} threads..."
+    return fmt_string.format(
+        tag=tag,
+        num_total=_amount_string(num_total, in_bytes),
+        num_threads=num_threads,
+    )
+
+
+def _auto_string(throughputs, choice, tag):
+    """Returns a string to be displayed once `processes="auto"` chose the number of processes. It
+    contains the measured `throughputs` in items per second per number of processes and the
+    `choice`. It is prefixed by the `tag`.
+    """
+    probed = ", ".join("%d (%.1f/s)" % (level, throughputs[level]) for level in sorted(throughputs))
+    return "{tag}: Auto processes: {probed} -> using {choice}".format(
+        tag=tag,
+        probed=probed or "-",
+        choice=choice,
+    )
+
+
+def _cluster_start_string(num_total, tag, address, in_bytes=False):
+    """Returns a string to be displayed before processing begins with the `cluster` backend.
+    It contains the number of total items and the address workers connect to. It is prefixed
+    by the `tag`. If `in_bytes` is set, `num_total` is the number of bytes to process.
+    """
+    fmt_string = "{tag}: Start processing {num_total} on cluster at {address}..."
+    return fmt_string.format(
+        tag=tag,
+        num_total=_amount_string(num_total, in_bytes),
+        address=address,
+    )
+
+
+def _finish_string(time_start, total_cpu_time, num_total, tag, current_time=lambda: time.time(), in_bytes=False):
     """Returns a string to be displayed after processing finished. It contains
     the number of processed items, the total time, and the average time per item.
-    It is prefixed by the `tag`.
+    It is prefixed by the `tag`. If `in_bytes` is set, `num_total` is the number of
+    processed bytes and the average time is given per MB.
 
     Where information are not available or a division by zero would occur, a `-` or `0ms` is returned for
     that field.
     """
     current_time = current_time()
     time_delta = current_time - time_start
-    average_cpu_time = total_cpu_time / num_total if num_total > 0 else None
+    per_unit = _BYTES_PER_MB if in_bytes else 1
+    average_cpu_time = total_cpu_time / num_total * per_unit if num_total > 0 else None
 
-    fmt_string = "{tag}: Finished processing {num_total} items in {time_delta} (avg: {time_avg} cpu)"
+    fmt_string = "{tag}: Finished processing {num_total} in {time_delta} (avg: {time_avg} cpu{per})"
     return fmt_string.format(
         tag=tag,
-        num_total=num_total,
+        num_total=_amount_string(num_total, in_bytes),
         time_delta=_relative_time_string(time_delta, no_ms=True),
         time_avg=_relative_time_string(average_cpu_time),
+        per="/MB" if in_bytes else "",
     )
 
 
-def _progress_string(total_cpu_time, num_processed, num_total, num_processes, tag):
+def _progress_string(total_cpu_time, num_processed, num_total, num_processes, tag, in_bytes=False):
     """Returns a string that reflects the current progress during execution. It contains
     the number of processed items, the total number of items, progress in percent, the
     average time per item so far, and an estimate of the remaining time. It is prefixed by the `tag`.
+    If `in_bytes` is set, the numbers are bytes and the average time is given per MB.
 
     Where information are not available or a division by zero would occur, a `-` or `0ms` is returned for
     that field.
@@ -95,9 +175,15 @@ def _progress_string(total_cpu_time, num_processed, num_total, num_processes, ta
     time_remaining = cpu_time_rem / num_processes if cpu_time_rem else None
 
     fmt_tag = "{tag}"
-    fmt_items = "{num_processed: >%d}/{num_total: >%d}, {percent:4.1f}%%" % (
-        digits, digits)
-    fmt_times = "avg: {time_avg} cpu, rem: {time_remaining}"
+    if in_bytes:
+        fmt_items = "{num_processed}/{num_total}, {percent:4.1f}%"
+        fmt_times = "avg: {time_avg} cpu/MB, rem: {time_remaining}"
+        num_processed, num_total = _size_string(num_processed), _size_string(num_total)
+        cpu_time_avg = cpu_time_avg * _BYTES_PER_MB if cpu_time_avg is not None else None
+    else:
+        fmt_items = "{num_processed: >%d}/{num_total: >%d}, {percent:4.1f}%%" % (
+            digits, digits)
+        fmt_times = "avg: {time_avg} cpu, rem: {time_remaining}"
     fmt_string = "%s: %s (%s)" % (fmt_tag, fmt_items, fmt_times)
 
     return fmt_string.format(
@@ -108,3 +194,16 @@ def _progress_string(total_cpu_time, num_processed, num_total, num_processes, ta
         time_avg=_relative_time_string(cpu_time_avg),
         time_remaining=_relative_time_string(time_remaining, no_ms=True),
     )
+
+
+def _transfer_string(bytes_sent, bytes_received, tag):
+    """Returns a string to be displayed after processing finished when a serializer
+    is used. It contains the number of bytes sent to and received from the workers.
+    It is prefixed by the `tag`.
+    """
+    fmt_string = "{tag}: Transferred {bytes_sent} to and {bytes_received} from workers"
+    return fmt_string.format(
+        tag=tag,
+        bytes_sent=_size_string(bytes_sent),
+        bytes_received=_size_string(bytes_received),
+    )
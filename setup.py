@@ -13,11 +13,17 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/lambdapioneer/busybee",
     packages=setuptools.find_packages(),
+    extras_require={
+        "cloudpickle": ["cloudpickle"],
+    },
+    entry_points={
+        "console_scripts": ["busybee=busybee.__main__:main"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "Operating System :: OS Independent",
         "License :: OSI Approved :: MIT License",
         "Development Status :: 5 - Production/Stable",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.8',
 )
@@ -5,3 +5,12 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 import busybee
 import busybee._busybee as _busybee
 import busybee._string_helpers as _string_helpers
+import busybee._serialization as _serialization
+import busybee._cluster as _cluster
+import busybee._cpus as _cpus
+import busybee._profiling as _profiling
+import busybee._concurrency as _concurrency
+import busybee._spill as _spill
+import busybee._lines as _lines
+import busybee._nesting as _nesting
+import busybee._autoscale as _autoscale
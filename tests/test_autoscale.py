@@ -0,0 +1,141 @@
+import functools
+import json
+import os
+import tempfile
+import unittest
+
+from .context import busybee, _autoscale, _cpus, _lines
+
+
+class ScalingProbeTestSuite(unittest.TestCase):
+
+    def test_scaling_probe_WHEN_max_limit_not_power_of_two_THEN_included_as_last_level(self):
+        actual = _autoscale._ScalingProbe(max_limit=6, max_items=1000)
+        self.assertListEqual([1, 2, 4, 6], actual.levels)
+
+    def test_scaling_probe_WHEN_single_level_THEN_fixed_without_probing(self):
+        actual = _autoscale._ScalingProbe(max_limit=1, max_items=1000)
+        self.assertEqual(1, actual.choice)
+        self.assertEqual(1, actual.current())
+
+    def test_scaling_probe_WHEN_linear_scaling_THEN_max_limit(self):
+        actual = probe_with_throughputs({1: 100.0, 2: 200.0, 4: 400.0, 8: 800.0}, max_limit=8)
+        self.assertEqual(8, actual.choice)
+        self.assertListEqual([1, 2, 4, 8], sorted(actual.throughputs))
+
+    def test_scaling_probe_WHEN_saturated_THEN_knee_and_stops_early(self):
+        actual = probe_with_throughputs({1: 100.0, 2: 190.0, 4: 200.0, 8: 100.0}, max_limit=8)
+        self.assertEqual(2, actual.choice)
+        self.assertListEqual([1, 2, 4], sorted(actual.throughputs))
+
+    def test_scaling_probe_WHEN_slower_with_more_THEN_one(self):
+        actual = probe_with_throughputs({1: 100.0, 2: 60.0}, max_limit=8)
+        self.assertEqual(1, actual.choice)
+
+    def test_scaling_probe_WHEN_max_items_reached_THEN_best_measured(self):
+        actual = probe_with_throughputs({1: 100.0, 2: 200.0, 4: 400.0, 8: 800.0}, max_limit=8, max_items=20)
+        self.assertEqual(2, actual.choice)
+        self.assertLessEqual(actual.completed, 20)
+
+    def test_scaling_probe_WHEN_chosen_THEN_on_choice_called_once(self):
+        calls = []
+        probe_with_throughputs({1: 100.0, 2: 200.0}, max_limit=2, on_choice=calls.append)
+        self.assertEqual(1, len(calls))
+
+    def test_scaling_probe_WHEN_short_items_THEN_measured_for_min_seconds(self):
+        actual = probe_with_throughputs({1: 1000.0, 2: 2000.0}, max_limit=2, min_seconds=0.05)
+        self.assertGreaterEqual(actual.completed, 1 + 4 + 1 + 100)
+
+
+class ChoiceCacheTestSuite(unittest.TestCase):
+
+    def test_choice_key_WHEN_function_THEN_module_and_name(self):
+        actual = _autoscale._choice_key(func_add_one, 8)
+        self.assertEqual("tests.test_autoscale.func_add_one@8", actual)
+
+    def test_choice_key_WHEN_callable_object_THEN_class_name(self):
+        actual = _autoscale._choice_key(AddOne(), 8)
+        self.assertEqual("tests.test_autoscale.AddOne@8", actual)
+
+    def test_choice_key_WHEN_partial_THEN_function_name(self):
+        actual = _autoscale._choice_key(functools.partial(func_add_one), 8)
+        self.assertEqual("tests.test_autoscale.func_add_one@8", actual)
+
+    def test_choice_key_WHEN_map_lines_THEN_wrapped_function_name(self):
+        actual_len = _autoscale._choice_key(_lines._LineRangeFunc(len, "utf-8"), 8)
+        actual_upper = _autoscale._choice_key(_lines._LineRangeFunc(str.upper, "utf-8"), 8)
+        self.assertEqual("busybee._lines._LineRangeFunc(builtins.len)@8", actual_len)
+        self.assertNotEqual(actual_len, actual_upper)
+
+    def test_store_choice_WHEN_loaded_THEN_same_choice(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "auto.json")
+            _autoscale._store_choice(path, "a", 3)
+            _autoscale._store_choice(path, "b", 5)
+            self.assertEqual(3, _autoscale._load_choice(path, "a"))
+            self.assertEqual(5, _autoscale._load_choice(path, "b"))
+            self.assertListEqual(["auto.json"], os.listdir(os.path.dirname(path)))
+
+    def test_load_choice_WHEN_missing_or_corrupt_THEN_none(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "auto.json")
+            self.assertIsNone(_autoscale._load_choice(path, "a"))
+
+            with open(path, "w") as f:
+                f.write("not json")
+            self.assertIsNone(_autoscale._load_choice(path, "a"))
+
+    def test_map_WHEN_auto_and_stored_choice_THEN_uses_it(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "auto.json")
+            with open(path, "w") as f:
+                json.dump({_autoscale._choice_key(func_add_one, _cpus._available_cpu_count()): 3}, f)
+
+            recorder = RecordingStdout()
+            actual = busybee.map(func_add_one, list(range(0, 10)), processes="auto", stdout=recorder, auto_cache=path)
+
+        self.assertListEqual(list(range(1, 11)), actual)
+        self.assertIn("with 3 processes", recorder.output)
+        self.assertNotIn("Auto processes", recorder.output)
+
+
+#
+# Helpers
+#
+
+
+def probe_with_throughputs(throughputs, max_limit, max_items=10000, **kwargs):
+    """Returns a `_ScalingProbe` that completed probing a simulated func whose throughput per
+    number of in-flight items is given by `throughputs`.
+    """
+    clock = [0.0]
+    probe = _autoscale._ScalingProbe(max_limit, max_items, current_time=lambda: clock[0], **kwargs)
+    while probe.choice is None:
+        level = probe.current()
+        clock[0] += 1.0 / throughputs[level]
+        probe.update(level / throughputs[level])
+    return probe
+
+
+class RecordingStdout():
+    """Matches the `write` method of sys.stdout and appends all
+    data to an internal `output` string.
+    """
+
+    def __init__(self):
+        self.output = ""
+
+    def write(self, string):
+        self.output += string
+
+
+class AddOne():
+    """A callable object that returns x + 1."""
+
+    def __call__(self, x):
+        return x + 1
+
+
+def func_add_one(x):
+    """Returns x + 1."""
+    return x + 1
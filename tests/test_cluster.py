@@ -0,0 +1,261 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from .context import busybee, _cluster
+
+AUTHKEY = "test-authkey"
+
+
+class AddressParsingTestSuite(unittest.TestCase):
+
+    def test_parse_address_WHEN_valid_THEN_tuple(self):
+        self.assertEqual(("localhost", 7392), _cluster._parse_address("localhost:7392"))
+        self.assertEqual(("0.0.0.0", 80), _cluster._parse_address(":80"))
+
+    def test_parse_address_WHEN_invalid_THEN_throws(self):
+        for address in ("localhost", "localhost:port", ""):
+            with self.assertRaises(ValueError):
+                _cluster._parse_address(address)
+
+    def test_resolve_authkey_WHEN_missing_THEN_throws(self):
+        environ = dict(os.environ)
+        os.environ.pop("BUSYBEE_AUTHKEY", None)
+        try:
+            with self.assertRaises(ValueError):
+                _cluster._resolve_authkey(None)
+        finally:
+            os.environ.update(environ)
+
+    def test_resolve_authkey_WHEN_string_THEN_bytes(self):
+        self.assertEqual(b"secret", _cluster._resolve_authkey("secret"))
+
+
+class CoordinatorTestSuite(unittest.TestCase):
+
+    def test_coordinator_WHEN_chunks_processed_THEN_results_returned(self):
+        coordinator = _cluster._Coordinator()
+        coordinator.put_chunk(0, ["a"])
+        coordinator.put_chunk(1, ["b"])
+
+        self.assertEqual((0, ["a"]), coordinator.get_chunk("w1"))
+        self.assertEqual((1, ["b"]), coordinator.get_chunk("w2"))
+        self.assertEqual(None, coordinator.get_chunk("w1", timeout=0))
+
+        coordinator.put_results("w2", 1, ["B"])
+        coordinator.put_results("w1", 0, ["A"])
+        results, num_workers = coordinator.get_results(timeout=0)
+        self.assertEqual([(1, ["B"]), (0, ["A"])], results)
+        self.assertEqual(2, num_workers)
+
+    def test_coordinator_WHEN_worker_dead_THEN_chunk_redispatched(self):
+        coordinator = _cluster._Coordinator(heartbeat_timeout=10)
+        coordinator.put_chunk(0, ["a"])
+        self.assertEqual((0, ["a"]), coordinator.get_chunk("w1"))
+
+        results, num_workers = coordinator.get_results(
+            timeout=0, current_time=_cluster.time.time() + 60)
+        self.assertEqual([], results)
+        self.assertEqual(0, num_workers)
+        self.assertEqual((0, ["a"]), coordinator.get_chunk("w2", timeout=0))
+
+    def test_coordinator_WHEN_results_sent_twice_THEN_returned_once(self):
+        coordinator = _cluster._Coordinator()
+        coordinator.put_chunk(0, ["a"])
+        coordinator.get_chunk("w1")
+
+        coordinator.put_results("w1", 0, ["A"])
+        coordinator.put_results("w2", 0, ["A"])
+        results, _ = coordinator.get_results(timeout=0)
+        self.assertEqual([(0, ["A"])], results)
+
+    def test_coordinator_WHEN_error_THEN_returned_in_place_of_results(self):
+        coordinator = _cluster._Coordinator()
+        coordinator.put_chunk(0, ["a"])
+        coordinator.get_chunk("w1")
+
+        coordinator.put_error("w1", 0, "error")
+        [(chunk_id, error)], _ = coordinator.get_results(timeout=0)
+        self.assertEqual(0, chunk_id)
+        self.assertIsInstance(error, _cluster._ChunkError)
+        self.assertEqual("error", error.payload)
+        self.assertEqual(None, coordinator.get_chunk("w2", timeout=0))
+
+    def test_coordinator_WHEN_finished_THEN_no_job_and_no_chunks(self):
+        coordinator = _cluster._Coordinator()
+        coordinator.start_job("job", None, None)
+        self.assertEqual(("job", None, None), coordinator.get_job("w1"))
+
+        coordinator.finish_job()
+        self.assertEqual(None, coordinator.get_job("w1"))
+        self.assertEqual(False, coordinator.get_chunk("w1"))
+
+
+class ClusterDriverTestSuite(unittest.TestCase):
+
+    def test_imap_unordered_WHEN_many_chunks_THEN_bounded_look_ahead(self):
+        driver = _cluster._ClusterDriver("localhost:0", AUTHKEY)
+        driver._coordinator = SingleWorkerCoordinator()
+
+        consumed = []
+        payloads = (consumed.append(x) or x for x in range(100))
+        actual = sorted(out for _, out, _ in driver.imap_unordered(payloads, chunksize=5))
+
+        self.assertListEqual(list(range(100)), actual)
+        self.assertEqual(2, driver._coordinator.max_pending)
+
+
+class LocalhostClusterTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        with socket.socket() as s:
+            s.bind(("localhost", 0))
+            self.address = "localhost:%d" % s.getsockname()[1]
+        self.workers = []
+
+    def tearDown(self):
+        for worker in self.workers:
+            worker.kill()
+            worker.wait()
+
+    def start_workers(self, num_workers):
+        env = dict(os.environ, BUSYBEE_AUTHKEY=AUTHKEY)
+        cwd = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+        for _ in range(num_workers):
+            self.workers.append(subprocess.Popen(
+                [sys.executable, "-m", "busybee", "worker", "--connect", self.address,
+                 "--processes", "1", "--retry", "10"],
+                cwd=cwd,
+                env=env,
+            ))
+
+    def test_cluster_WHEN_several_workers_THEN_in_order_and_applied(self):
+        self.start_workers(3)
+        recorder = RecordingStdout()
+
+        actual = busybee.map(
+            func=func_add_one,
+            data=list(range(0, 1000)),
+            stdout=recorder,
+            backend="cluster",
+            cluster_address=self.address,
+            cluster_authkey=AUTHKEY,
+        )
+
+        self.assertListEqual(actual, list(range(1, 1001)))
+        self.assertIn("Start processing 1000 items on cluster at %s" % self.address, recorder.output)
+        self.assertIn("Finished processing 1000 items", recorder.output)
+
+    def test_cluster_WHEN_worker_dies_THEN_chunk_redispatched(self):
+        self.start_workers(2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            marker = os.path.join(tmp, "died")
+            actual = busybee.map(
+                func=func_add_one_or_die_once,
+                data=[(marker, x) for x in range(0, 100)],
+                stdout=RecordingStdout(),
+                backend="cluster",
+                cluster_address=self.address,
+                cluster_authkey=AUTHKEY,
+                cluster_heartbeat_timeout=2,
+            )
+
+            self.assertTrue(os.path.exists(marker))
+        self.assertListEqual(actual, list(range(1, 101)))
+
+    def test_cluster_WHEN_func_raises_THEN_raised_by_driver(self):
+        self.start_workers(1)
+
+        with self.assertRaises(ZeroDivisionError) as context:
+            busybee.map(
+                func=func_one_over,
+                data=list(range(-10, 10)),
+                stdout=RecordingStdout(),
+                backend="cluster",
+                cluster_address=self.address,
+                cluster_authkey=AUTHKEY,
+            )
+        self.assertIn("func_one_over", str(context.exception.__cause__))
+
+    def test_cluster_WHEN_no_workers_THEN_timeout(self):
+        with self.assertRaises(TimeoutError):
+            busybee.map(
+                func=func_add_one,
+                data=list(range(0, 10)),
+                stdout=RecordingStdout(),
+                backend="cluster",
+                cluster_address=self.address,
+                cluster_authkey=AUTHKEY,
+                cluster_idle_timeout=1,
+            )
+
+    def test_cluster_WHEN_no_authkey_THEN_throws(self):
+        environ = dict(os.environ)
+        os.environ.pop("BUSYBEE_AUTHKEY", None)
+        try:
+            with self.assertRaises(ValueError):
+                busybee.map(func_add_one, [1], backend="cluster", stdout=RecordingStdout())
+        finally:
+            os.environ.update(environ)
+
+
+#
+# Helpers
+#
+
+
+class RecordingStdout():
+    """Matches the `write` method of sys.stdout and appends all
+    data to an internal `output` string.
+    """
+
+    def __init__(self):
+        self.output = ""
+
+    def write(self, string):
+        self.output += string
+
+
+class SingleWorkerCoordinator(_cluster._Coordinator):
+    """A coordinator with a simulated worker that processes one pending chunk per call of
+    `get_results` and records the maximal number of pending chunks in `max_pending`.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.max_pending = 0
+
+    def put_chunk(self, chunk_id, payloads):
+        super().put_chunk(chunk_id, payloads)
+        self.max_pending = max(self.max_pending, len(self._pending))
+
+    def get_results(self, timeout=0.5, current_time=None):
+        chunk = self.get_chunk("w1", timeout=0)
+        if chunk:
+            chunk_id, payloads = chunk
+            self.put_results("w1", chunk_id, [(x, 0.0) for x in payloads])
+        return super().get_results(timeout=0, current_time=current_time)
+
+
+def func_add_one(x):
+    """Returns x + 1."""
+    return x + 1
+
+
+def func_one_over(x):
+    """Returns 1 / x."""
+    return 1 / x
+
+
+def func_add_one_or_die_once(args):
+    """Takes `(marker, x)` and returns x + 1. Kills the current process the
+    first time x == 42 is processed and creates the `marker` file."""
+    marker, x = args
+    if x == 42 and not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return x + 1
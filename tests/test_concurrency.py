@@ -0,0 +1,184 @@
+import socket
+import socketserver
+import threading
+import time
+import unittest
+
+from .context import busybee, _concurrency
+
+
+class ConcurrencyLimitTestSuite(unittest.TestCase):
+
+    def test_concurrency_limit_WHEN_latency_stable_THEN_grows_to_max(self):
+        limit = _concurrency._ConcurrencyLimit(max_limit=8)
+        self.assertEqual(1, limit.current())
+
+        for _ in range(100):
+            limit.update(0.1)
+        self.assertEqual(8, limit.current())
+
+    def test_concurrency_limit_WHEN_latency_rises_THEN_shrinks(self):
+        limit = _concurrency._ConcurrencyLimit(max_limit=8)
+        for _ in range(100):
+            limit.update(0.1)
+
+        for _ in range(100):
+            limit.update(1.0)
+        self.assertEqual(1, limit.current())
+
+    def test_concurrency_limit_WHEN_latency_depends_on_limit_THEN_settles_below_max(self):
+        limit = _concurrency._ConcurrencyLimit(max_limit=32)
+
+        # a simulated backend with capacity 4 that slows down linearly when overloaded
+        limits = []
+        for _ in range(1000):
+            limit.update(0.1 * max(1.0, limit.current() / 4))
+            limits.append(limit.current())
+
+        steady = sorted(limits[200:])
+        self.assertLessEqual(steady[-1], 8)
+        self.assertGreaterEqual(steady[len(steady) // 2], 4)
+
+    def test_concurrency_limit_WHEN_probe_interval_THEN_baseline_measured_again(self):
+        limit = _concurrency._ConcurrencyLimit(max_limit=8, probe_interval=100)
+        for _ in range(99):
+            limit.update(0.1)
+        self.assertEqual(8, limit.current())
+
+        limit.update(0.1)
+        self.assertEqual(1, limit.current())
+        self.assertEqual(None, limit.baseline_latency)
+
+        # a backend that became slower in general is the new baseline and the limit is restored
+        for _ in range(8 + 3):
+            limit.update(0.5)
+        self.assertEqual(0.5, limit.baseline_latency)
+        self.assertEqual(8, limit.current())
+
+        for _ in range(80):
+            limit.update(0.5)
+        self.assertEqual(8, limit.current())
+
+    def test_concurrency_limit_WHEN_latency_stable_and_large_max_THEN_reaches_max(self):
+        limit = _concurrency._ConcurrencyLimit(max_limit=64)
+
+        limits = []
+        for _ in range(5000):
+            limit.update(0.1)
+            limits.append(limit.current())
+
+        self.assertEqual(64, max(limits))
+        steady = sorted(limits[-1000:])
+        self.assertEqual(64, steady[len(steady) // 2])
+
+    def test_concurrency_limit_WHEN_fixed_THEN_constant(self):
+        limit = _concurrency._ConcurrencyLimit(max_limit=4, min_limit=4)
+        for latency in (0.1, 10.0, 0.1, 100.0):
+            limit.update(latency)
+            self.assertEqual(4, limit.current())
+
+
+class TokenBucketTestSuite(unittest.TestCase):
+
+    def test_token_bucket_WHEN_rate_exceeded_THEN_delay(self):
+        now = [0.0]
+        bucket = _concurrency._TokenBucket(rate=10, burst=2, current_time=lambda: now[0])
+
+        self.assertEqual(0.0, bucket.delay())
+        self.assertEqual(0.0, bucket.delay())
+        self.assertAlmostEqual(0.1, bucket.delay())
+
+        now[0] = 0.1
+        self.assertEqual(0.0, bucket.delay())
+        self.assertAlmostEqual(0.1, bucket.delay())
+
+    def test_token_bucket_WHEN_invalid_rate_THEN_throws(self):
+        with self.assertRaises(ValueError):
+            _concurrency._TokenBucket(rate=0)
+
+
+class SimulatedSlowServerTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.server = SlowServer(("localhost", 0), SlowHandler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_map_WHEN_adaptive_against_slow_server_THEN_in_order_and_below_max(self):
+        handle = busybee.map_async(
+            func=func_request,
+            data=[(self.port, x) for x in range(0, 150)],
+            processes=16,
+            concurrency="adaptive",
+            quiet=True,
+        )
+
+        self.assertListEqual(handle.result(timeout=60), list(range(1, 151)))
+        self.assertLess(handle.progress()["num_processes"], 16)
+        self.assertLessEqual(self.server.max_active, 16)
+
+    def test_map_WHEN_max_rate_THEN_throttled(self):
+        time_start = time.time()
+        actual = busybee.map(
+            func=func_request,
+            data=[(self.port, x) for x in range(0, 10)],
+            processes=4,
+            max_rate=20,
+            quiet=True,
+        )
+
+        self.assertListEqual(actual, list(range(1, 11)))
+        self.assertGreaterEqual(time.time() - time_start, 9 / 20)
+
+    def test_map_WHEN_invalid_concurrency_THEN_throws(self):
+        with self.assertRaises(ValueError):
+            busybee.map(func_request, [1], quiet=True, concurrency="fast")
+
+
+#
+# Helpers
+#
+
+
+class SlowServer(socketserver.ThreadingTCPServer):
+    """A local server with a capacity of 2 concurrent requests that answers
+    every request after 20ms and slows down linearly when overloaded."""
+
+    daemon_threads = True
+    capacity = 2
+    latency = 0.02
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+
+class SlowHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        with self.server.lock:
+            self.server.active += 1
+            self.server.max_active = max(self.server.max_active, self.server.active)
+            load = self.server.active / self.server.capacity
+
+        time.sleep(self.server.latency * max(1.0, load))
+        x = int(self.request.recv(64))
+        self.request.sendall(str(x + 1).encode())
+
+        with self.server.lock:
+            self.server.active -= 1
+
+
+def func_request(args):
+    """Takes `(port, x)` and returns x + 1 as computed by the slow server."""
+    port, x = args
+    with socket.create_connection(("localhost", port)) as s:
+        s.sendall(str(x).encode())
+        return int(s.recv(64))
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from .context import _cpus
+
+
+class CgroupCpuLimitTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, content):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def test_cgroup_cpu_limit_WHEN_no_files_THEN_none(self):
+        self.assertEqual(None, _cpus._cgroup_cpu_limit(self.root))
+
+    def test_cgroup_cpu_limit_WHEN_v2_quota_THEN_rounded_up(self):
+        self.write("cpu.max", "150000 100000\n")
+        self.assertEqual(2, _cpus._cgroup_cpu_limit(self.root))
+
+    def test_cgroup_cpu_limit_WHEN_v2_max_THEN_none(self):
+        self.write("cpu.max", "max 100000\n")
+        self.assertEqual(None, _cpus._cgroup_cpu_limit(self.root))
+
+    def test_cgroup_cpu_limit_WHEN_v1_quota_THEN_rounded_up(self):
+        self.write("cpu,cpuacct/cpu.cfs_quota_us", "800000\n")
+        self.write("cpu,cpuacct/cpu.cfs_period_us", "100000\n")
+        self.assertEqual(8, _cpus._cgroup_cpu_limit(self.root))
+
+    def test_cgroup_cpu_limit_WHEN_v1_unlimited_THEN_none(self):
+        self.write("cpu/cpu.cfs_quota_us", "-1\n")
+        self.write("cpu/cpu.cfs_period_us", "100000\n")
+        self.assertEqual(None, _cpus._cgroup_cpu_limit(self.root))
+
+    def test_available_cpu_count_WHEN_quota_THEN_limited(self):
+        self.write("cpu.max", "50000 100000\n")
+        self.assertEqual(1, _cpus._available_cpu_count(self.root))
+
+    def test_available_cpu_count_WHEN_no_quota_THEN_affinity(self):
+        self.assertEqual(
+            len(os.sched_getaffinity(0)),
+            _cpus._available_cpu_count(self.root))
+
+
+class ThreadLimitTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.environ = {v: os.environ.get(v) for v in _cpus._THREAD_ENV_VARS}
+
+    def tearDown(self):
+        _cpus._restore_thread_env(self.environ)
+
+    def test_cap_thread_env_WHEN_unset_or_higher_THEN_capped(self):
+        os.environ.pop("OMP_NUM_THREADS", None)
+        os.environ["MKL_NUM_THREADS"] = "64"
+        os.environ["OPENBLAS_NUM_THREADS"] = "1"
+
+        previous = _cpus._cap_thread_env(4)
+        self.assertEqual("4", os.environ["OMP_NUM_THREADS"])
+        self.assertEqual("4", os.environ["MKL_NUM_THREADS"])
+        self.assertEqual("1", os.environ["OPENBLAS_NUM_THREADS"])
+
+        _cpus._restore_thread_env(previous)
+        self.assertNotIn("OMP_NUM_THREADS", os.environ)
+        self.assertEqual("64", os.environ["MKL_NUM_THREADS"])
@@ -2,7 +2,7 @@ import multiprocessing as mp
 import random
 import unittest
 
-from .context import _busybee
+from .context import _busybee, _autoscale
 
 
 class processespecParsingTestSuite(unittest.TestCase):
@@ -80,6 +80,32 @@ class MetaFuncTestSuite(unittest.TestCase):
         self.assertEqual(2, actual[0])
 
 
+class ImapProbedTestSuite(unittest.TestCase):
+
+    def test_imap_probed_WHEN_chosen_THEN_remaining_items_in_chunks(self):
+        pool = RecordingPool()
+        probe = _autoscale._ScalingProbe(max_limit=1, max_items=100)
+        meta_args = [(abs, -x) for x in range(0, 100)]
+
+        actual = list(_busybee._imap_probed(pool, _busybee._meta_func, meta_args, probe, chunksize=10))
+
+        self.assertListEqual(list(range(0, 100)), [idx for idx, _, _ in actual])
+        self.assertListEqual(list(range(0, 100)), [out for _, out, _ in actual])
+        self.assertEqual(10, pool.num_calls)
+
+    def test_imap_probed_WHEN_probing_THEN_one_by_one_then_chunks(self):
+        pool = RecordingPool()
+        probe = _autoscale._ScalingProbe(max_limit=4, max_items=20)
+        meta_args = [(abs, -x) for x in range(0, 200)]
+
+        actual = list(_busybee._imap_probed(pool, _busybee._meta_func, meta_args, probe, chunksize=10))
+
+        self.assertListEqual(list(range(0, 200)), sorted(out for _, out, _ in actual))
+        self.assertTrue(all(idx == out for idx, out, _ in actual))
+        self.assertIsNotNone(probe.choice)
+        self.assertLess(pool.num_calls, 20 + 200 // 10 + 1)
+
+
 class ProgressUpdateLimitTestSuite(unittest.TestCase):
 
     def test_progress_update_limit_WHEN_time_passes_THEN_issues_correct_updates(self):
@@ -133,3 +159,26 @@ class ProgressUpdateLimitTestSuite(unittest.TestCase):
         )
 
         self.assertEqual(False, pul.should_print(100, lambda: 100))
+
+
+#
+# Helpers
+#
+
+
+class RecordingPool():
+    """Matches the `apply_async` method of a pool, runs the calls synchronously, and counts
+    them in `num_calls`.
+    """
+
+    def __init__(self):
+        self.num_calls = 0
+
+    def apply_async(self, func, args, callback, error_callback):
+        self.num_calls += 1
+        try:
+            result = func(*args)
+        except Exception as e:
+            error_callback(e)
+        else:
+            callback(result)
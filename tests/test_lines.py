@@ -0,0 +1,152 @@
+import os
+import tempfile
+import unittest
+
+from .context import busybee, _lines
+
+
+class SplitRangesTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_split_ranges_WHEN_small_range_bytes_THEN_contiguous_and_aligned(self):
+        content = b"".join(b"line %d\n" % i for i in range(1000))
+        path = self.write("a.txt", content)
+
+        ranges = _lines._split_ranges([path], range_bytes=100)
+        self.assertGreater(len(ranges), 10)
+        self.assertEqual(0, ranges[0][1])
+        self.assertEqual(len(content), ranges[-1][2])
+        for (_, _, end), (_, start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(b"\n", content[end - 1:end])
+
+    def test_split_ranges_WHEN_long_line_THEN_range_extends_to_line_end(self):
+        path = self.write("a.txt", b"x" * 500 + b"\nshort\n")
+
+        ranges = _lines._split_ranges([path], range_bytes=10)
+        self.assertEqual([(path, 0, 501), (path, 501, 507)], ranges)
+
+    def test_split_ranges_WHEN_no_trailing_newline_or_empty_file_THEN_covered(self):
+        path = self.write("a.txt", b"a\nb\nc")
+        empty = self.write("b.txt", b"")
+
+        ranges = _lines._split_ranges([path, empty], range_bytes=1)
+        self.assertEqual([(path, 0, 2), (path, 2, 4), (path, 4, 5)], ranges)
+
+    def test_expand_paths_WHEN_glob_THEN_sorted_matches(self):
+        b = self.write("b.txt", b"")
+        a = self.write("a.txt", b"")
+        self.write("c.csv", b"")
+
+        self.assertEqual([a, b], _lines._expand_paths(os.path.join(self.tmp.name, "*.txt")))
+        self.assertEqual([b], _lines._expand_paths(b))
+        self.assertEqual([b, a], _lines._expand_paths([b, a]))
+
+    def test_expand_paths_WHEN_glob_without_matches_THEN_throws(self):
+        with self.assertRaises(FileNotFoundError):
+            _lines._expand_paths(os.path.join(self.tmp.name, "*.json"))
+
+
+class LineRangeFuncTestSuite(unittest.TestCase):
+
+    def test_line_range_func_WHEN_crlf_and_encoding_THEN_lines_without_terminator(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "a.txt")
+            with open(path, "wb") as f:
+                f.write("ä\r\nb\nc".encode("utf-8"))
+
+            self.assertEqual(["ä", "b", "c"], _lines._LineRangeFunc(str, "utf-8")((path, 0, 7)))
+            self.assertEqual([b"b", b"c"], _lines._LineRangeFunc(bytes, None)((path, 4, 7)))
+
+
+class MapLinesTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.lines = ["line %d" % i for i in range(10000)]
+        for name, lines in (("a.txt", self.lines[:5000]), ("b.txt", self.lines[5000:])):
+            with open(os.path.join(self.tmp.name, name), "w") as f:
+                f.write("\n".join(lines) + "\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_map_lines_WHEN_glob_THEN_in_file_order_and_applied(self):
+        recorder = RecordingStdout()
+        actual = busybee.map_lines(
+            func=len,
+            paths=os.path.join(self.tmp.name, "*.txt"),
+            processes=2,
+            stdout=recorder,
+            range_bytes=1000,
+        )
+
+        self.assertListEqual(actual, [len(line) for line in self.lines])
+        self.assertIn("Start processing 98.9kB with 2 processes", recorder.output)
+        self.assertIn("Finished processing 98.9kB", recorder.output)
+        self.assertIn("cpu/MB)", recorder.output)
+
+    def test_map_lines_WHEN_single_path_THEN_in_file_order_and_applied(self):
+        actual = busybee.map_lines(
+            func=str.upper,
+            paths=os.path.join(self.tmp.name, "a.txt"),
+            processes=2,
+            quiet=True,
+        )
+        self.assertListEqual(actual, [line.upper() for line in self.lines[:5000]])
+
+    def test_map_lines_WHEN_spill_to_THEN_lazy_sequence_in_file_order(self):
+        spill_dir = os.path.join(self.tmp.name, "spill")
+        actual = busybee.map_lines(
+            func=str.upper,
+            paths=os.path.join(self.tmp.name, "*.txt"),
+            processes=2,
+            quiet=True,
+            range_bytes=1000,
+            spill_to=spill_dir,
+            spill_memory_budget=0,
+        )
+
+        self.assertIsInstance(actual, _lines._FlatResults)
+        self.assertGreater(actual.range_results.num_spilled, 50)
+        self.assertEqual(10000, len(actual))
+        self.assertEqual("LINE 0", actual[0])
+        self.assertEqual("LINE 9999", actual[-1])
+        self.assertListEqual(["LINE 4999", "LINE 5000"], actual[4999:5001])
+        self.assertListEqual(list(actual), [line.upper() for line in self.lines])
+        with self.assertRaises(IndexError):
+            actual[10000]
+
+    def test_map_lines_WHEN_empty_file_THEN_empty_list(self):
+        path = os.path.join(self.tmp.name, "empty.txt")
+        open(path, "w").close()
+
+        self.assertListEqual([], busybee.map_lines(len, path, quiet=True))
+
+
+#
+# Helpers
+#
+
+
+class RecordingStdout():
+    """Matches the `write` method of sys.stdout and appends all
+    data to an internal `output` string.
+    """
+
+    def __init__(self):
+        self.output = ""
+
+    def write(self, string):
+        self.output += string
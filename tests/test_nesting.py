@@ -0,0 +1,47 @@
+import multiprocessing as mp
+import unittest
+
+from .context import _nesting
+
+
+class SlotsTestSuite(unittest.TestCase):
+
+    def test_borrow_slots_WHEN_free_slots_THEN_takes_up_to_max_count(self):
+        slots = mp.BoundedSemaphore(4)
+        self.assertEqual(3, _nesting._borrow_slots(slots, 3))
+        self.assertEqual(1, _nesting._borrow_slots(slots, 3))
+        self.assertEqual(0, _nesting._borrow_slots(slots, 3))
+
+    def test_borrow_slots_WHEN_unstarted_items_THEN_zero(self):
+        slots = mp.BoundedSemaphore(4)
+        num_unstarted = mp.Value("q", 1)
+        self.assertEqual(0, _nesting._borrow_slots(slots, 3, num_unstarted))
+
+        num_unstarted.value = 0
+        self.assertEqual(3, _nesting._borrow_slots(slots, 3, num_unstarted))
+
+    def test_borrow_slots_WHEN_no_semaphore_THEN_zero(self):
+        self.assertEqual(0, _nesting._borrow_slots(None, 3))
+
+    def test_release_slots_WHEN_borrowed_THEN_available_again(self):
+        slots = mp.BoundedSemaphore(2)
+        count = _nesting._borrow_slots(slots, 2)
+        _nesting._release_slots(slots, count)
+        self.assertEqual(2, _nesting._borrow_slots(slots, 5))
+
+    def test_in_pool_worker_WHEN_main_process_THEN_false(self):
+        self.assertFalse(_nesting._in_pool_worker())
+
+
+class ThreadPoolTestSuite(unittest.TestCase):
+
+    def test_start_thread_pool_WHEN_imap_THEN_timed_results_in_order(self):
+        pool = _nesting._start_thread_pool(2)
+        try:
+            actual = list(pool.imap(_nesting._meta_func_threaded, [(abs, -1), (abs, -2)]))
+        finally:
+            pool.close()
+
+        self.assertListEqual([1, 2], [out for out, _ in actual])
+        self.assertTrue(all(time_delta >= 0.0 for _, time_delta in actual))
+
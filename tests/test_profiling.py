@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+from .context import _profiling
+
+
+class SampledProfilerTestSuite(unittest.TestCase):
+
+    def test_sampled_profiler_WHEN_rate_one_THEN_all_calls_profiled(self):
+        profiler = _profiling._SampledProfiler(sample_rate=1.0)
+        for x in range(10):
+            self.assertEqual(x + 1, profiler.call(func_add_one, x))
+
+        self.assertEqual(10, profiler.num_calls)
+        self.assertEqual(10, profiler.num_sampled)
+
+    def test_sampled_profiler_WHEN_rate_fraction_THEN_fraction_profiled(self):
+        profiler = _profiling._SampledProfiler(sample_rate=0.1)
+        for x in range(100):
+            self.assertEqual(x + 1, profiler.call(func_add_one, x))
+
+        self.assertEqual(100, profiler.num_calls)
+        self.assertEqual(10, profiler.num_sampled)
+
+    def test_sampled_profiler_WHEN_rate_zero_THEN_nothing_dumped(self):
+        profiler = _profiling._SampledProfiler(sample_rate=0.0)
+        profiler.call(func_add_one, 1)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler.dump(os.path.join(tmp, "1.prof"))
+            self.assertEqual(None, _profiling._merge_profiles(tmp))
+
+
+class MergeProfilesTestSuite(unittest.TestCase):
+
+    def test_merge_profiles_WHEN_several_dumps_THEN_merged_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for pid in (1, 2):
+                profiler = _profiling._SampledProfiler()
+                profiler.call(func_add_one, pid)
+                profiler.dump(os.path.join(tmp, "%d.prof" % pid))
+
+            stats = _profiling._merge_profiles(tmp)
+            actual = _profiling._profile_string(stats, "tag", top=5)
+
+        self.assertIn("tag: Profile of the workers, top 5", actual)
+        self.assertIn("func_add_one", actual)
+        self.assertNotIn(tmp, actual)
+
+
+def func_add_one(x):
+    """Returns x + 1."""
+    return x + 1
@@ -1,7 +1,12 @@
+import os
+import pickle
+import tempfile
 import time
 import unittest
+from unittest import mock
+from concurrent.futures import CancelledError, TimeoutError
 
-from .context import busybee
+from .context import busybee, _busybee, _cpus, _serialization
 
 
 #
@@ -43,6 +48,203 @@ class CorrectnessTestSuite(unittest.TestCase):
         )
         self.assertListEqual(actual, list(range(1, 1001)))
 
+    def test_map_WHEN_serializer_THEN_in_order_and_applied(self):
+        for serializer in ["pickle"] + (["cloudpickle"] if _serialization.cloudpickle else []):
+            actual = busybee.map(
+                func=func_add_one,
+                data=list(range(0, 1000)),
+                processes=2,
+                stdout=NullStdout(),
+                serializer=serializer,
+                compress=True,
+            )
+            self.assertListEqual(actual, list(range(1, 1001)))
+
+    @unittest.skipIf(_serialization.cloudpickle is None, "requires the cloudpickle package")
+    def test_map_WHEN_cloudpickle_serializer_THEN_lambda_supported(self):
+        actual = busybee.map(
+            func=lambda x: x * 2,
+            data=list(range(0, 100)),
+            processes=2,
+            stdout=NullStdout(),
+            serializer="cloudpickle",
+        )
+        self.assertListEqual(actual, list(range(0, 200, 2)))
+
+    def test_map_WHEN_serializer_with_buffers_THEN_applied(self):
+        actual = busybee.map(
+            func=func_reverse,
+            data=[bytearray(b"abc" * 1000)] * 10,
+            processes=2,
+            stdout=NullStdout(),
+            serializer="pickle",
+        )
+        self.assertListEqual(actual, [bytearray(b"cba" * 1000)] * 10)
+
+    def test_map_WHEN_serializer_with_pickle_buffers_THEN_transported_and_applied(self):
+        actual = busybee.map(
+            func=func_reverse_zero_copy,
+            data=[ZeroCopyBytes(b"abc" * 1000)] * 10,
+            processes=2,
+            stdout=NullStdout(),
+            serializer="pickle",
+        )
+        self.assertListEqual(actual, [ZeroCopyBytes(b"cba" * 1000)] * 10)
+        self.assertTrue(all(type(out) is ZeroCopyBytes for out in actual))
+
+    def test_map_WHEN_invalid_serializer_THEN_throws(self):
+        with self.assertRaises(ValueError):
+            busybee.map(func_add_one, [1], stdout=NullStdout(), serializer="json")
+
+    def test_map_WHEN_start_method_THEN_in_order_and_applied(self):
+        for start_method in ("fork", "spawn", "forkserver"):
+            actual = busybee.map(
+                func=func_add_one,
+                data=list(range(0, 100)),
+                processes=2,
+                stdout=NullStdout(),
+                start_method=start_method,
+            )
+            self.assertListEqual(actual, list(range(1, 101)))
+
+    def test_map_WHEN_preload_THEN_in_order_and_applied(self):
+        actual = busybee.map(
+            func=func_add_one,
+            data=list(range(0, 100)),
+            processes=2,
+            stdout=NullStdout(),
+            preload=["json"],
+        )
+        self.assertListEqual(actual, list(range(1, 101)))
+
+    def test_map_WHEN_invalid_start_method_or_preload_THEN_throws(self):
+        with self.assertRaises(ValueError):
+            busybee.map(func_add_one, [1], stdout=NullStdout(), start_method="clone")
+
+        with self.assertRaises(ValueError):
+            busybee.map(func_add_one, [1], stdout=NullStdout(), start_method="spawn", preload=["json"])
+
+    def test_map_WHEN_limit_threads_THEN_thread_env_capped_in_workers(self):
+        actual = busybee.map(
+            func=func_get_env,
+            data=["OMP_NUM_THREADS"] * 4,
+            processes=2,
+            stdout=NullStdout(),
+        )
+        expected = str(max(1, _cpus._available_cpu_count() // 2))
+        self.assertListEqual([expected] * 4, actual)
+        self.assertNotIn("OMP_NUM_THREADS", os.environ)
+
+    def test_map_WHEN_limit_threads_and_higher_preset_THEN_lowered_in_workers_only(self):
+        os.environ["OMP_NUM_THREADS"] = "1024"
+        try:
+            actual = busybee.map(
+                func=func_get_env,
+                data=["OMP_NUM_THREADS"] * 4,
+                processes=2,
+                stdout=NullStdout(),
+            )
+            expected = str(max(1, _cpus._available_cpu_count() // 2))
+            self.assertListEqual([expected] * 4, actual)
+            self.assertEqual("1024", os.environ["OMP_NUM_THREADS"])
+        finally:
+            del os.environ["OMP_NUM_THREADS"]
+
+    def test_map_WHEN_pin_workers_THEN_workers_on_single_cpu(self):
+        actual = busybee.map(
+            func=func_get_affinity,
+            data=list(range(0, 4)),
+            processes=2,
+            stdout=NullStdout(),
+            pin_workers=True,
+        )
+        self.assertTrue(all(len(cpus) == 1 for cpus in actual))
+
+    def test_map_WHEN_spill_to_THEN_lazy_sequence_in_order_and_applied(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            actual = busybee.map(
+                func=func_add_one,
+                data=list(range(0, 1000)),
+                processes=2,
+                stdout=NullStdout(),
+                spill_to=tmp,
+                spill_memory_budget=100,
+            )
+
+            self.assertGreater(actual.num_spilled, 900)
+            self.assertEqual(1000, len(actual))
+            self.assertEqual(1, actual[0])
+            self.assertEqual(1000, actual[-1])
+            self.assertListEqual(list(actual), list(range(1, 1001)))
+            del actual
+
+    def test_map_WHEN_many_items_THEN_in_order_and_applied(self):
+        actual = busybee.map(func_add_one, list(range(0, 2500)), processes=2, stdout=NullStdout())
+        self.assertListEqual(actual, list(range(1, 2501)))
+
+    def test_map_WHEN_many_items_and_serializer_THEN_in_order_and_applied(self):
+        actual = busybee.map(
+            func=func_add_one,
+            data=list(range(0, 2500)),
+            processes=2,
+            stdout=NullStdout(),
+            serializer="pickle",
+        )
+        self.assertListEqual(actual, list(range(1, 2501)))
+
+    def test_map_WHEN_processes_auto_THEN_in_order_and_applied(self):
+        actual = busybee.map(
+            func=func_add_one_slow,
+            data=list(range(0, 200)),
+            processes="auto",
+            stdout=NullStdout(),
+        )
+        self.assertListEqual(actual, list(range(1, 201)))
+
+    def test_map_WHEN_nested_THEN_in_order_and_applied(self):
+        actual = busybee.map(
+            func=func_sum_nested,
+            data=[list(range(0, 10)), list(range(0, 20)), list(range(0, 30))],
+            processes=2,
+            stdout=NullStdout(),
+        )
+        self.assertListEqual(actual, [55, 210, 465])
+
+    def test_map_WHEN_nested_and_idle_workers_THEN_borrows_their_slots(self):
+        actual = busybee.map(func_start_nested, ["threads"], processes=3, stdout=NullStdout())
+        self.assertIn("nested with 3 threads", actual[0])
+
+    def test_map_WHEN_nested_and_all_workers_busy_THEN_single_thread(self):
+        actual = busybee.map(func_start_nested, ["threads"], processes=1, stdout=NullStdout())
+        self.assertIn("nested with 1 threads", actual[0])
+
+    def test_map_WHEN_nested_THEN_outer_items_still_in_parallel(self):
+        # the second outer item is dispatched 0.2s after the first one while its worker is idle
+        actual = busybee.map(func_start_time_nested, [0, 1], processes=2, stdout=NullStdout(), max_rate=5)
+
+        # a nested map takes 0.5s with a borrowed slot and must not delay the other outer item
+        self.assertLess(abs(actual[0] - actual[1]), 0.35)
+
+    def test_map_WHEN_nested_serial_THEN_single_thread(self):
+        actual = busybee.map(func_start_nested, ["serial"], processes=3, stdout=NullStdout())
+        self.assertIn("nested with 1 threads", actual[0])
+
+    def test_map_WHEN_invalid_nested_THEN_raises(self):
+        with self.assertRaises(ValueError):
+            busybee.map(func_add_one, [1, 2], stdout=NullStdout(), nested="processes")
+
+    def test_filter_WHEN_spill_to_THEN_in_order_and_applied(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            actual = busybee.filter(
+                func=func_is_even,
+                data=list(range(0, 1000)),
+                processes=2,
+                stdout=NullStdout(),
+                spill_to=tmp,
+                spill_memory_budget=0,
+            )
+        self.assertListEqual(actual, list(range(0, 1000, 2)))
+
     def test_filter_WHEN_empty_list_THEN_empty_list(self):
         actual = busybee.filter(func_add_one, [], stdout=NullStdout())
         self.assertListEqual(actual, [])
@@ -105,6 +307,98 @@ class CorrectnessTestSuite(unittest.TestCase):
         self.assertDictEqual(actual, {1: 2, 2: 3, 3: 4, 4: 5, 5: 6})
 
 
+class MapAsyncTestSuite(unittest.TestCase):
+
+    def test_map_async_WHEN_result_THEN_in_order_and_applied(self):
+        handle = busybee.map_async(
+            func=func_add_one,
+            data=list(range(0, 1000)),
+            processes=2,
+            stdout=NullStdout(),
+        )
+        self.assertListEqual(handle.result(timeout=30), list(range(1, 1001)))
+        self.assertTrue(handle.done())
+        self.assertFalse(handle.cancelled())
+        self.assertFalse(handle.cancel())
+
+        progress = handle.progress()
+        self.assertEqual(1000, progress["num_processed"])
+        self.assertEqual(1000, progress["num_total"])
+        self.assertEqual(2, progress["num_processes"])
+
+    def test_map_async_WHEN_several_runs_THEN_overlapped(self):
+        handles = [
+            busybee.map_async(
+                func=func_add_one_slow,
+                data=list(range(0, 20)),
+                processes=2,
+                stdout=NullStdout(),
+            )
+            for _ in range(3)
+        ]
+        for handle in handles:
+            self.assertListEqual(handle.result(timeout=30), list(range(1, 21)))
+
+    def test_map_async_WHEN_not_finished_THEN_timeout(self):
+        handle = busybee.map_async(
+            func=func_add_one_slow,
+            data=list(range(0, 100)),
+            processes=1,
+            stdout=NullStdout(),
+        )
+        with self.assertRaises(TimeoutError):
+            handle.result(timeout=0.01)
+        self.assertFalse(handle.done())
+        handle.result()
+
+    def test_map_async_WHEN_cancelled_THEN_stops_and_raises(self):
+        handle = busybee.map_async(
+            func=func_add_one_slow,
+            data=list(range(0, 1000)),
+            processes=2,
+            stdout=NullStdout(),
+        )
+        while handle.progress()["num_processed"] == 0:
+            time.sleep(0.01)
+
+        self.assertTrue(handle.cancel())
+        self.assertTrue(handle.done())
+        self.assertTrue(handle.cancelled())
+        self.assertLess(handle.progress()["num_processed"], 1000)
+        with self.assertRaises(CancelledError):
+            handle.result()
+
+    def test_map_async_WHEN_func_fails_THEN_result_raises(self):
+        handle = busybee.map_async(
+            func=func_add_one,
+            data=[1, None],
+            processes=1,
+            stdout=NullStdout(),
+        )
+        with self.assertRaises(TypeError):
+            handle.result(timeout=30)
+
+
+    def test_map_async_WHEN_overlapping_runs_with_thread_caps_THEN_environment_restored(self):
+        cap_thread_env = _busybee._cap_thread_env
+
+        def slow_cap_thread_env(num_threads):
+            previous = cap_thread_env(num_threads)
+            time.sleep(0.2)
+            return previous
+
+        with mock.patch.object(_busybee, "_available_cpu_count", lambda: 8), \
+                mock.patch.object(_busybee, "_cap_thread_env", slow_cap_thread_env):
+            handles = [
+                busybee.map_async(func_get_env, ["OMP_NUM_THREADS"] * 4, processes=p, stdout=NullStdout())
+                for p in (1, 2)
+            ]
+            actual = [handle.result(timeout=30) for handle in handles]
+
+        self.assertListEqual([["8"] * 4, ["4"] * 4], actual)
+        self.assertNotIn("OMP_NUM_THREADS", os.environ)
+
+
 class OutputTestSuite(unittest.TestCase):
 
     def test_map_WHEN_empty_list_THEN_warning_output(self):
@@ -137,7 +431,7 @@ class OutputTestSuite(unittest.TestCase):
         )
 
         self.assertIn("Start processing 100 items", recorder.output)
-        self.assertIn("2 processes", recorder.output)
+        self.assertIn("2 processes (startup: ", recorder.output)
 
         self.assertIn("50/100, 50.0%", recorder.output)
         self.assertIn("avg: 10ms cpu,", recorder.output)
@@ -145,6 +439,39 @@ class OutputTestSuite(unittest.TestCase):
 
         self.assertIn("Finished processing 100 items", recorder.output)
         self.assertIn("(avg: 10ms cpu)", recorder.output)
+        self.assertNotIn("Transferred", recorder.output)
+
+    def test_map_WHEN_serializer_THEN_outputs_transferred_bytes(self):
+        recorder = RecordingStdout()
+        busybee.map(
+            func=func_add_one,
+            data=[1, 2, 3],
+            processes=1,
+            stdout=recorder,
+            serializer="pickle",
+        )
+
+        self.assertIn("Transferred", recorder.output)
+        self.assertIn("from workers", recorder.output)
+
+    def test_map_WHEN_profile_THEN_hot_spots_after_finish_and_stats_written(self):
+        recorder = RecordingStdout()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "map.prof")
+            busybee.map(
+                func=func_add_one_slow,
+                data=list(range(0, 20)),
+                processes=2,
+                stdout=recorder,
+                profile=path,
+                profile_sample_rate=0.5,
+            )
+
+            self.assertTrue(os.path.exists(path))
+
+        finish = recorder.output.index("Finished processing 20 items")
+        self.assertIn("Profile of the workers", recorder.output[finish:])
+        self.assertIn("func_add_one_slow", recorder.output[finish:])
 
 
 #
@@ -182,6 +509,59 @@ def func_add_one_slow(x):
     return x + 1
 
 
+def func_reverse(x):
+    """Returns the reversed x."""
+    return x[::-1]
+
+
+class ZeroCopyBytes(bytearray):
+    """A bytearray that pickle protocol 5 passes as out-of-band `PickleBuffer` (see PEP 574)."""
+
+    def __reduce_ex__(self, protocol):
+        if protocol >= 5:
+            return type(self)._reconstruct, (pickle.PickleBuffer(self),), None
+        return type(self)._reconstruct, (bytearray(self),)
+
+    @classmethod
+    def _reconstruct(cls, obj):
+        with memoryview(obj) as m:
+            return cls(m)
+
+
+def func_reverse_zero_copy(x):
+    """Returns the reversed x as `ZeroCopyBytes`."""
+    return ZeroCopyBytes(x[::-1])
+
+
+def func_get_env(name):
+    """Returns the value of the environment variable `name`."""
+    return os.environ.get(name)
+
+
+def func_get_affinity(_):
+    """Returns the CPUs the current process may run on."""
+    return os.sched_getaffinity(0)
+
+
+def func_sum_nested(xs):
+    """Returns the sum of xs + 1 computed by a nested map."""
+    return sum(busybee.map(func_add_one, xs, processes=2, stdout=NullStdout()))
+
+
+def func_start_time_nested(_):
+    """Returns the start time of a nested map that sleeps 10 times for 100ms."""
+    time_start = time.time()
+    busybee.map(time.sleep, [0.1] * 10, processes=2, stdout=NullStdout())
+    return time_start
+
+
+def func_start_nested(nested):
+    """Returns the output of a nested map with the given `nested` mode."""
+    stdout = RecordingStdout()
+    busybee.map(func_add_one, list(range(0, 10)), processes=4, stdout=stdout, nested=nested)
+    return stdout.output
+
+
 def func_is_even(x):
     """Returns `True` iff x is divisible by 2."""
     return x % 2 == 0
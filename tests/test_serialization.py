@@ -0,0 +1,73 @@
+import pickle
+import unittest
+
+from .context import _serialization
+
+# The `cloudpickle` serializer is only tested if the optional package is installed
+SERIALIZER_NAMES = ["pickle"] + (["cloudpickle"] if _serialization.cloudpickle else [])
+
+
+class SerializerTestSuite(unittest.TestCase):
+
+    def test_serializer_WHEN_unknown_name_THEN_throws(self):
+        with self.assertRaises(ValueError):
+            _serialization._Serializer("json")
+
+    def test_serializer_WHEN_roundtrip_THEN_equal(self):
+        for name in SERIALIZER_NAMES:
+            serializer = _serialization._Serializer(name)
+            obj = {"a": [1, 2, 3], "b": "text"}
+            self.assertEqual(obj, serializer.loads(serializer.dumps(obj)))
+
+    def test_serializer_WHEN_bytes_THEN_passed_as_buffer(self):
+        serializer = _serialization._Serializer("pickle")
+        for obj in (b"x" * 1000, bytearray(b"x" * 1000)):
+            payload = serializer.dumps(obj)
+            self.assertIs(obj, payload[2][0])
+            self.assertEqual(1000, _serialization._payload_size(payload))
+
+            actual = serializer.loads(payload)
+            self.assertEqual(obj, actual)
+            self.assertIs(type(obj), type(actual))
+
+    def test_serializer_WHEN_pickle_buffer_THEN_sent_out_of_band(self):
+        serializer = _serialization._Serializer("pickle")
+        obj = [pickle.PickleBuffer(bytearray(b"x" * 1000))]
+
+        compressed, main, buffers = serializer.dumps(obj)
+        self.assertFalse(compressed)
+        self.assertEqual(1, len(buffers))
+        self.assertLess(len(main), 1000)
+
+        actual = serializer.loads((compressed, main, buffers))
+        self.assertEqual(bytearray(b"x" * 1000), actual[0])
+
+    def test_serializer_WHEN_pickle_buffer_THEN_payload_pickleable_with_protocol_4(self):
+        serializer = _serialization._Serializer("pickle")
+        payload = serializer.dumps([pickle.PickleBuffer(bytearray(b"x" * 1000))])
+
+        transported = pickle.loads(pickle.dumps(payload, protocol=4))
+        self.assertEqual(bytearray(b"x" * 1000), serializer.loads(transported)[0])
+
+    @unittest.skipIf(_serialization.cloudpickle is None, "requires the cloudpickle package")
+    def test_serializer_WHEN_cloudpickle_THEN_supports_lambdas(self):
+        serializer = _serialization._Serializer("cloudpickle")
+        func = serializer.loads(serializer.dumps(lambda x: x + 1))
+        self.assertEqual(2, func(1))
+
+    def test_serializer_WHEN_compress_large_payload_THEN_smaller_and_equal(self):
+        serializer = _serialization._Serializer(
+            "pickle", compress=True, compress_threshold=100)
+        for obj in (bytearray(b"x" * 10000), ["x" * 10000]):
+            payload = serializer.dumps(obj)
+            self.assertTrue(payload[0])
+            self.assertLess(_serialization._payload_size(payload), 1000)
+            self.assertEqual(obj, serializer.loads(payload))
+
+    def test_serializer_WHEN_compress_small_payload_THEN_uncompressed(self):
+        serializer = _serialization._Serializer(
+            "pickle", compress=9, compress_threshold=100)
+
+        payload = serializer.dumps([1, 2, 3])
+        self.assertFalse(payload[0])
+        self.assertEqual([1, 2, 3], serializer.loads(payload))
@@ -0,0 +1,89 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from .context import _spill
+
+
+class SpillingListTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_spilling_list_WHEN_within_budget_THEN_nothing_spilled(self):
+        actual = _spill._SpillingList(3, self.tmp.name, memory_budget=10**6)
+        for idx, item in enumerate(["a", "b", "c"]):
+            actual[idx] = item
+
+        self.assertEqual(0, actual.num_spilled)
+        self.assertEqual(["a", "b", "c"], list(actual))
+
+    def test_spilling_list_WHEN_beyond_budget_THEN_spilled_and_readable(self):
+        items = [("item", i, "x" * 100) for i in range(100)]
+        actual = _spill._SpillingList(100, self.tmp.name, memory_budget=1000)
+
+        # set in reverse order as results may arrive out of order
+        for idx in reversed(range(100)):
+            actual[idx] = items[idx]
+
+        self.assertGreater(actual.num_spilled, 90)
+        self.assertGreater(os.path.getsize(actual.path), 90 * 100)
+        self.assertEqual(100, len(actual))
+        self.assertEqual(items[0], actual[0])
+        self.assertEqual(items[99], actual[-1])
+        self.assertEqual(items[10:20], actual[10:20])
+        self.assertEqual(items, list(actual))
+        self.assertIn(items[42], actual)
+
+    def test_spilling_list_WHEN_size_given_THEN_not_pickled_within_budget(self):
+        actual = _spill._SpillingList(2, self.tmp.name, memory_budget=100)
+
+        # a lambda cannot be pickled, so it must be kept in memory without measuring it
+        func = lambda x: x
+        actual.put(0, func, size=60)
+        actual.put(1, "b" * 50, size=50)
+
+        self.assertIs(func, actual[0])
+        self.assertEqual(1, actual.num_spilled)
+        self.assertEqual(60, actual.memory_used)
+        self.assertEqual("b" * 50, actual[1])
+
+    def test_spilling_list_WHEN_records_THEN_unpickled_within_budget_and_spilled_as_is(self):
+        records = [pickle.dumps(("item", i, "x" * 100)) for i in range(10)]
+        actual = _spill._SpillingList(10, self.tmp.name, memory_budget=len(records[0]) * 3)
+        for idx, record in enumerate(records):
+            actual.put_record(idx, record)
+
+        self.assertEqual(7, actual.num_spilled)
+        self.assertEqual([pickle.loads(r) for r in records], list(actual))
+        self.assertEqual(sum(len(r) + 8 for r in records[3:]), os.path.getsize(actual.path))
+
+    def test_spilling_list_WHEN_bytes_THEN_measured_by_length(self):
+        actual = _spill._SpillingList(2, self.tmp.name, memory_budget=100)
+        actual[0] = b"a" * 100
+        actual[1] = b"b"
+
+        self.assertEqual(100, actual.memory_used)
+        self.assertEqual(1, actual.num_spilled)
+
+    def test_spilling_list_WHEN_read_between_writes_THEN_remapped(self):
+        actual = _spill._SpillingList(2, self.tmp.name, memory_budget=0)
+        actual[0] = "first"
+        self.assertEqual("first", actual[0])
+
+        actual[1] = "second"
+        self.assertEqual(["first", "second"], list(actual))
+
+    def test_spilling_list_WHEN_garbage_collected_THEN_file_removed(self):
+        actual = _spill._SpillingList(1, self.tmp.name, memory_budget=0)
+        actual[0] = "spilled"
+        self.assertEqual("spilled", actual[0])
+
+        path = actual.path
+        self.assertTrue(os.path.exists(path))
+        del actual
+        self.assertFalse(os.path.exists(path))
@@ -39,6 +39,21 @@ class RelativeTimeStringTestSuite(unittest.TestCase):
             _sh._relative_time_string(-11*3600 - 23*60 - 45))
 
 
+class SizeStringTestSuite(unittest.TestCase):
+
+    def test_size_string_WHEN_none_THEN_dash(self):
+        self.assertEqual("-", _sh._size_string(None))
+
+    def test_size_string_WHEN_in_byte_area_THEN_byte_string(self):
+        self.assertEqual("0B", _sh._size_string(0))
+        self.assertEqual("999B", _sh._size_string(999))
+
+    def test_size_string_WHEN_larger_THEN_unit_string(self):
+        self.assertEqual("1.0kB", _sh._size_string(1000))
+        self.assertEqual("2.5MB", _sh._size_string(2500000))
+        self.assertEqual("1200.0GB", _sh._size_string(1.2e12))
+
+
 class StartStringTestSuite(unittest.TestCase):
 
     def test_start_string_WHEN_given_info_THEN_all_in_output(self):
@@ -46,6 +61,25 @@ class StartStringTestSuite(unittest.TestCase):
         self.assertIn("tag:", actual)
         self.assertIn("100 items", actual)
         self.assertIn("8 processes", actual)
+        self.assertNotIn("startup", actual)
+
+    def test_start_string_WHEN_in_bytes_THEN_size_in_output(self):
+        actual = _sh._start_string(4200000, "tag", 8, in_bytes=True)
+        self.assertIn("processing 4.2MB with 8 processes", actual)
+
+    def test_start_string_WHEN_given_startup_time_THEN_in_output(self):
+        actual = _sh._start_string(100, "tag", 8, startup_time=0.042)
+        self.assertIn("8 processes (startup: 42ms)", actual)
+
+    def test_auto_string_WHEN_given_info_THEN_all_in_output(self):
+        actual = _sh._auto_string({2: 190.0, 1: 100.0, 4: 200.04}, 2, "tag")
+        self.assertIn("tag:", actual)
+        self.assertIn("1 (100.0/s), 2 (190.0/s), 4 (200.0/s) -> using 2", actual)
+
+    def test_nested_start_string_WHEN_given_info_THEN_all_in_output(self):
+        actual = _sh._nested_start_string(100, "tag", 3)
+        self.assertIn("tag:", actual)
+        self.assertIn("100 items nested with 3 threads", actual)
 
 
 class FinishStringTestSuite(unittest.TestCase):
@@ -63,6 +97,18 @@ class FinishStringTestSuite(unittest.TestCase):
         self.assertIn("in 4.2s", actual)
         self.assertIn("avg: 42ms", actual)
 
+    def test_finish_string_WHEN_in_bytes_THEN_size_and_time_per_mb_in_output(self):
+        actual = _sh._finish_string(
+            time_start=0.0,
+            total_cpu_time=4.2,
+            num_total=2000000,
+            tag="tag",
+            current_time=lambda: 4.2,
+            in_bytes=True,
+        )
+        self.assertIn("processing 2.0MB in 4.2s", actual)
+        self.assertIn("avg: 2.1s cpu/MB", actual)
+
     def test_finish_string_WHEN_given_zeros_THEN_output_valid(self):
         actual = _sh._finish_string(
             time_start=0.0,
@@ -79,6 +125,19 @@ class FinishStringTestSuite(unittest.TestCase):
 
 class ProgressStringTestSuite(unittest.TestCase):
 
+    def test_progress_string_WHEN_in_bytes_THEN_sizes_and_time_per_mb_in_output(self):
+        actual = _sh._progress_string(
+            total_cpu_time=2.0,
+            num_processed=1000000,
+            num_total=4000000,
+            num_processes=2,
+            tag="tag",
+            in_bytes=True,
+        )
+        self.assertIn("tag: 1.0MB/4.0MB, 25.0%", actual)
+        self.assertIn("avg: 2.0s cpu/MB", actual)
+        self.assertIn("rem: 3.0s", actual)
+
     def test_progress_string_WHEN_given_info_THEN_all_in_output(self):
         actual = _sh._progress_string(
             total_cpu_time=42.0,
@@ -106,3 +165,16 @@ class ProgressStringTestSuite(unittest.TestCase):
         self.assertIn("0%", actual)
         self.assertIn("avg: - cpu", actual)
         self.assertIn("rem: -", actual)
+
+
+class TransferStringTestSuite(unittest.TestCase):
+
+    def test_transfer_string_WHEN_given_info_THEN_all_in_output(self):
+        actual = _sh._transfer_string(
+            bytes_sent=1500,
+            bytes_received=42,
+            tag="tag",
+        )
+        self.assertIn("tag:", actual)
+        self.assertIn("1.5kB to", actual)
+        self.assertIn("42B from", actual)